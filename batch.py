@@ -0,0 +1,370 @@
+import numpy as np
+
+from board import Board
+import ranking
+
+# Batched move generation on NumPy arrays of unique IDs, which pack the
+# two 24-bit piece masks and the turn metadata of a board into a uint64.
+# Every step is an array operation over all boards of a chunk and all
+# candidate moves at once, using lookup tables built from Board.
+#
+# A candidate move is a placement on a point or a shift between two
+# points. Which candidates are legal for a board depends only on its
+# masks, its phase and whether the side to move is flying.
+
+_num_points = Board.num_points
+_full_mask = np.uint32(Board.full_mask)
+_point_bits = np.left_shift(
+    np.uint32(1), np.arange(_num_points, dtype=np.uint32))
+_meta_shift = np.uint64(2 * _num_points)
+_white = Board.Player.white.value
+_black = Board.Player.black.value
+
+
+def _get_candidates():
+    source_points = []
+    target_points = []
+    placements = []
+    adjacent = []
+    for target_point in range(_num_points):
+        source_points.append(-1)
+        target_points.append(target_point)
+        placements.append(True)
+        adjacent.append(False)
+    for source_point in range(_num_points):
+        for target_point in range(_num_points):
+            if source_point == target_point:
+                continue
+            source_points.append(source_point)
+            target_points.append(target_point)
+            placements.append(False)
+            adjacent.append(
+                target_point in Board.adjacent_points[source_point])
+    return (np.array(source_points, dtype=np.intp),
+            np.array(target_points, dtype=np.intp),
+            np.array(placements), np.array(adjacent))
+
+
+_source_points, _target_points, _placements, _adjacent = _get_candidates()
+_source_bits = np.where(
+    _placements, np.uint32(0), _point_bits[_source_points])
+_target_bits = _point_bits[_target_points]
+
+# The shift candidates alone.
+_shift_sources = _source_points[~_placements]
+_shift_targets = _target_points[~_placements]
+_shift_adjacent = _adjacent[~_placements]
+
+# The mills through each point, every point lies on the same number.
+_point_mills = np.array(Board.point_mills, dtype=np.uint32)
+_first_mills, _second_mills = _point_mills.T.copy()
+
+# symmetry, byte of the mask, byte value -> permuted bits.
+_symmetry_tables = np.array(Board.symmetry_tables, dtype=np.uint32)
+
+_popcount_table = np.array(
+    [bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+# binomial(n, k) for every n and k up to the number of points, and one
+# past it in k.
+_binomials = np.array(
+    [[ranking.binomial(n, k) for k in range(_num_points + 2)]
+     for n in range(_num_points + 1)], dtype=np.int64)
+
+
+# Subsets are ranked _rank_bits points at a time.
+_rank_bits = 12
+_rank_mask = (1 << _rank_bits) - 1
+
+
+def _get_subset_rank_tables():
+
+    # For each group of _rank_bits points, indexed by the count of points
+    # below the group << _rank_bits | the points in the group, the part
+    # of the subset rank they contribute, as in ranking.
+
+    group_values = np.arange(1 << _rank_bits)
+    counts_below = np.arange(_num_points + 1)[:, None]
+    rank_tables = []
+    for shift in range(0, _num_points, _rank_bits):
+        rank_table = np.zeros(
+            (_num_points + 1, 1 << _rank_bits), dtype=np.int64)
+        element_indexes = counts_below + 1
+        for bit in range(min(_rank_bits, _num_points - shift)):
+            bits = (group_values >> bit) & 1
+            rank_table += bits * _binomials[
+                shift + bit, np.minimum(element_indexes, _num_points + 1)]
+            element_indexes = element_indexes + bits
+        rank_tables.append(rank_table.reshape(-1))
+    return rank_tables
+
+
+def _get_group_popcounts():
+    popcounts = np.zeros(1 << _rank_bits, dtype=np.intp)
+    for bit in range(_rank_bits):
+        popcounts += (np.arange(1 << _rank_bits) >> bit) & 1
+    return popcounts
+
+
+def _get_compress_table():
+    # Indexed by skip_byte << 8 | byte, as in ranking.
+    skip_bytes, byte_values = np.divmod(np.arange(1 << 16), 256)
+    compress_table = np.zeros(1 << 16, dtype=np.uint32)
+    kept_below = np.zeros(1 << 16, dtype=np.int64)
+    for bit in range(8):
+        kept = ((skip_bytes >> bit) & 1) ^ 1
+        compress_table |= (((byte_values >> bit) & kept) <<
+                           kept_below).astype(np.uint32)
+        kept_below += kept
+    return compress_table
+
+
+_subset_rank_tables = _get_subset_rank_tables()
+_group_popcounts = _get_group_popcounts()
+_compress_table = _get_compress_table()
+
+
+def popcount(masks):
+    return (_popcount_table[masks & 0xff] +
+            _popcount_table[(masks >> 8) & 0xff] +
+            _popcount_table[masks >> 16])
+
+
+def pack(white_masks, black_masks, turn_nums, players):
+    meta = (turn_nums.astype(np.int64) + 1) * len(Board.Player) + \
+        players.astype(np.int64) - 1
+    return (meta.astype(np.uint64) << _meta_shift) | \
+        (white_masks.astype(np.uint64) << np.uint64(_num_points)) | \
+        black_masks.astype(np.uint64)
+
+
+def unpack(board_ids):
+
+    # Returns the white and black masks, the turn numbers and the
+    # Board.Player values of the side to move.
+
+    board_ids = np.asarray(board_ids, dtype=np.uint64)
+    white_masks = ((board_ids >> np.uint64(_num_points)) &
+                   np.uint64(Board.full_mask)).astype(np.uint32)
+    black_masks = (board_ids & np.uint64(Board.full_mask)).astype(np.uint32)
+    turn_indexes, player_indexes = np.divmod(
+        (board_ids >> _meta_shift).astype(np.int64), len(Board.Player))
+    return (white_masks, black_masks, turn_indexes - 1,
+            (player_indexes + 1).astype(np.int8))
+
+
+def rank_masks(white_masks, black_masks, white_count=None,
+               black_count=None):
+
+    # ranking.rank_masks over arrays: white is ranked as a subset of all
+    # points, black as a subset of the points white leaves empty. The
+    # piece counts may be given when all boards are of one class.
+
+    white_masks = np.asarray(white_masks, dtype=np.uint32)
+    black_masks = np.asarray(black_masks, dtype=np.uint32)
+
+    compressed_masks = np.zeros(white_masks.shape, dtype=np.uint32)
+    shifts = np.zeros(white_masks.shape, dtype=np.uint32)
+    for shift in range(0, _num_points, 8):
+        skip_bytes = (white_masks >> shift) & 0xff
+        compressed_masks |= _compress_table[
+            skip_bytes << 8 | (black_masks >> shift) & 0xff] << shifts
+        shifts += 8 - _popcount_table[skip_bytes]
+
+    if white_count is None:
+        white_count = popcount(white_masks)
+    if black_count is None:
+        black_count = popcount(black_masks)
+    return _rank_subsets(white_masks) * \
+        _binomials[_num_points - white_count, black_count] + \
+        _rank_subsets(compressed_masks)
+
+
+def _rank_subsets(masks):
+    subset_ranks = np.zeros(masks.shape, dtype=np.int64)
+    counts_below = np.zeros(masks.shape, dtype=np.intp)
+    for group_index, rank_table in enumerate(_subset_rank_tables):
+        group_values = (masks >> (_rank_bits * group_index)) & _rank_mask
+        subset_ranks += rank_table[counts_below << _rank_bits | group_values]
+        counts_below += _group_popcounts[group_values]
+    return subset_ranks
+
+
+def unrank_masks(white_count, black_count, indices):
+    # ranking.unrank_masks over an array of indices of one class.
+    free_points = _num_points - white_count
+    white_ranks, black_ranks = np.divmod(
+        np.asarray(indices, dtype=np.int64),
+        _binomials[free_points, black_count])
+
+    white_masks = _unrank_subsets(white_ranks, white_count)
+    compressed_masks = _unrank_subsets(black_ranks, black_count)
+
+    # Spreads the compressed black bits over the points white leaves empty.
+    black_masks = np.zeros(white_masks.shape, dtype=np.int64)
+    free_below = np.zeros(white_masks.shape, dtype=np.int64)
+    for point in range(_num_points):
+        free_bits = ((white_masks >> point) & 1) ^ 1
+        black_masks |= ((compressed_masks >> free_below) & free_bits) << point
+        free_below += free_bits
+    return white_masks.astype(np.uint32), black_masks.astype(np.uint32)
+
+
+def _unrank_subsets(subset_ranks, count):
+    subset_ranks = subset_ranks.copy()
+    masks = np.zeros(subset_ranks.shape, dtype=np.int64)
+    for element_index in range(count, 0, -1):
+        # The largest point whose binomial does not exceed the rank.
+        points = np.searchsorted(
+            _binomials[:_num_points, element_index], subset_ranks,
+            side='right') - 1
+        subset_ranks -= _binomials[points, element_index]
+        masks |= np.left_shift(1, points)
+    return masks
+
+
+def get_shifts(mover_masks, empty_masks, flying):
+
+    # Returns (parents, source points, target points) of every shift of
+    # a piece of the mover to an empty point, adjacent unless flying.
+    # Flying pieces are taken one at a time, since any empty point is a
+    # target.
+
+    if not flying:
+        sources = _shift_sources[_shift_adjacent]
+        targets = _shift_targets[_shift_adjacent]
+        parents, candidates = np.nonzero(
+            ((mover_masks[:, None] & _point_bits[sources][None, :]) != 0) &
+            ((empty_masks[:, None] & _point_bits[targets][None, :]) != 0))
+        return parents, sources[candidates], targets[candidates]
+
+    shifts = []
+    remaining_masks = mover_masks.copy()
+    empty_targets = (empty_masks[:, None] & _point_bits[None, :]) != 0
+    while remaining_masks.any():
+        low_bits = remaining_masks & (~remaining_masks + np.uint32(1))
+        remaining_masks ^= low_bits
+        parents, targets = np.nonzero(
+            empty_targets & (low_bits != 0)[:, None])
+        # The exponent of a power of two is one past its bit index.
+        source_points = np.frexp(low_bits)[1] - 1
+        shifts.append((parents, source_points[parents], targets))
+    return tuple(np.concatenate(arrays).astype(np.intp)
+                 for arrays in zip(*shifts))
+
+
+def closes_mill(masks, points):
+
+    # Whether each point lies in a mill that is full in the matching
+    # mask. Every point lies in exactly two mills.
+
+    first_mills = _first_mills[points]
+    second_mills = _second_mills[points]
+    return ((masks & first_mills) == first_mills) | \
+        ((masks & second_mills) == second_mills)
+
+
+def permute(masks, symmetry):
+    tables = _symmetry_tables[symmetry]
+    return (tables[0][masks & 0xff] |
+            tables[1][(masks >> 8) & 0xff] |
+            tables[2][masks >> 16])
+
+
+def canonicalize(board_ids, symmetry_group=None):
+
+    # Maps every unique ID to the universal ID of its board.
+
+    white_masks, black_masks, turn_nums, players = unpack(board_ids)
+    return _get_universal_ids(
+        white_masks, black_masks, turn_nums, players, symmetry_group)
+
+
+def _get_universal_ids(white_masks, black_masks, turn_nums, players,
+                       symmetry_group):
+    canonical_masks = None
+    for symmetry in range(Board.get_symmetry_count(symmetry_group)):
+        masks = (permute(white_masks, symmetry).astype(np.uint64) <<
+                 np.uint64(_num_points)) | \
+            permute(black_masks, symmetry).astype(np.uint64)
+        if canonical_masks is None:
+            canonical_masks = masks
+        else:
+            np.minimum(canonical_masks, masks, out=canonical_masks)
+    return pack(np.zeros_like(white_masks), np.zeros_like(black_masks),
+                turn_nums, players) | canonical_masks
+
+
+def get_child_ids(board_ids, symmetry_group=None, chunk_size=1 << 14):
+
+    # Returns the sorted universal IDs of all children of the boards,
+    # without duplicates. Boards that are already won have no children.
+
+    board_ids = np.asarray(board_ids, dtype=np.uint64)
+    chunks = [
+        _get_chunk_child_ids(board_ids[start:start + chunk_size],
+                             symmetry_group)
+        for start in range(0, len(board_ids), chunk_size)]
+    if not chunks:
+        return np.zeros(0, dtype=np.uint64)
+    return np.unique(np.concatenate(chunks))
+
+
+def _get_chunk_child_ids(board_ids, symmetry_group):
+    white_masks, black_masks, turn_nums, players = unpack(board_ids)
+    white_moves = players == _white
+    mover_masks = np.where(white_moves, white_masks, black_masks)
+    opponent_masks = np.where(white_moves, black_masks, white_masks)
+    empty_masks = _full_mask & ~(mover_masks | opponent_masks)
+
+    placing = turn_nums >= 0
+    mover_counts = popcount(mover_masks)
+    live = placing | ((mover_counts >= Board.flying_count) &
+                      (popcount(opponent_masks) >= Board.flying_count))
+    flying = mover_counts == Board.flying_count
+
+    # Legal (board, candidate) pairs.
+    legal = (empty_masks[:, None] & _target_bits[None, :]) != 0
+    legal &= live[:, None]
+    legal &= np.where(
+        _placements[None, :],
+        placing[:, None],
+        ~placing[:, None] &
+        ((mover_masks[:, None] & _source_bits[None, :]) != 0) &
+        (_adjacent[None, :] | flying[:, None]))
+    parents, candidates = np.nonzero(legal)
+
+    moved_masks = (mover_masks[parents] ^ _source_bits[candidates]) | \
+        _target_bits[candidates]
+    mill_moves = closes_mill(moved_masks, _target_points[candidates])
+
+    # A mill takes any one piece of the opponent.
+    mill_parents = parents[mill_moves]
+    mill_moved_masks = moved_masks[mill_moves]
+    captures, capture_points = np.nonzero(
+        (opponent_masks[mill_parents][:, None] & _point_bits[None, :]) != 0)
+
+    quiet = ~mill_moves
+    child_parents = np.concatenate((parents[quiet], mill_parents[captures]))
+    child_movers = np.concatenate((
+        opponent_masks[parents[quiet]],
+        opponent_masks[mill_parents[captures]] ^ _point_bits[capture_points]))
+    child_opponents = np.concatenate((
+        moved_masks[quiet], mill_moved_masks[captures]))
+
+    child_turn_nums = turn_nums[child_parents]
+    child_placing = child_turn_nums >= 0
+    child_turn_nums = np.where(
+        child_placing, child_turn_nums + 1, child_turn_nums)
+    child_turn_nums[child_turn_nums >= Board.placement_turns] = -1
+    child_players = (_white + _black - players[child_parents]).astype(np.int8)
+
+    child_white_moves = child_players == _white
+    child_white_masks = np.where(
+        child_white_moves, child_movers, child_opponents)
+    child_black_masks = np.where(
+        child_white_moves, child_opponents, child_movers)
+
+    return np.unique(_get_universal_ids(
+        child_white_masks, child_black_masks, child_turn_nums,
+        child_players, symmetry_group))
@@ -0,0 +1,75 @@
+import random
+import unittest
+
+from board import Board
+from state_space import Enumeration
+
+try:
+    import numpy
+    import batch
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestBatch(unittest.TestCase):
+    def get_board_ids(self, count, seed=0):
+        # Boards from random games, in both phases of the game.
+        rng = random.Random(seed)
+        board_ids = []
+        for _ in range(count):
+            board = Board()
+            for _ in range(rng.randrange(60)):
+                move_points = list(board.get_move_points())
+                if board.get_winner() is not Board.Player.none or \
+                        not move_points:
+                    break
+                board.apply_points(*rng.choice(move_points))
+            board_ids.append(board.get_unique_id())
+        return board_ids
+
+    def test_pack(self):
+        board_ids = self.get_board_ids(50)
+        array = numpy.array(board_ids, dtype=numpy.uint64)
+        self.assertEqual(batch.pack(*batch.unpack(array)).tolist(),
+                         board_ids)
+
+        white_masks, black_masks, turn_nums, players = batch.unpack(array)
+        for index, board_id in enumerate(board_ids):
+            board = Board.from_unique_id(board_id)
+            self.assertEqual(white_masks[index], board.white_mask)
+            self.assertEqual(black_masks[index], board.black_mask)
+            self.assertEqual(turn_nums[index], board.turn_num)
+            self.assertEqual(players[index], board.next_player.value)
+        self.assertEqual(
+            batch.popcount(white_masks).tolist(),
+            [mask.bit_count() for mask in white_masks.tolist()])
+
+    def test_canonicalize(self):
+        board_ids = self.get_board_ids(50)
+        for symmetry_group in Board.SymmetryGroup:
+            self.assertEqual(
+                batch.canonicalize(
+                    numpy.array(board_ids, dtype=numpy.uint64),
+                    symmetry_group).tolist(),
+                [Board.from_unique_id(board_id).get_universal_id(
+                    symmetry_group) for board_id in board_ids])
+
+    def test_child_ids(self):
+        board_ids = self.get_board_ids(100, seed=1)
+        for symmetry_group in Board.SymmetryGroup:
+            enumeration = Enumeration(symmetry_group=symmetry_group)
+            expected = sorted({
+                child_id for board_id in board_ids
+                for _, child_id in enumeration.get_children(board_id)})
+            with self.subTest(symmetry_group=symmetry_group):
+                self.assertEqual(
+                    batch.get_child_ids(
+                        numpy.array(board_ids, dtype=numpy.uint64),
+                        symmetry_group, chunk_size=7).tolist(),
+                    expected)
+
+    def test_empty(self):
+        self.assertEqual(len(batch.get_child_ids([])), 0)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import sys
+import time
+
+from board import Board
+from move import Move
+
+# Curated positions as (white points, black points, turn number, side to
+# move) and the perft depth each is counted to.
+positions = {
+    'initial': ((), (), 0, 'white', 4),
+    'placing': ((0, 9, 12, 20), (1, 8, 17, 22), 8, 'white', 3),
+    'mill_threats': ((0, 1, 9, 17, 20), (2, 7, 15, 16, 21), 10, 'white', 3),
+    'movement': ((0, 2, 3, 9, 12, 14, 20, 23),
+                 (1, 5, 8, 11, 17, 18, 21), -1, 'white', 3),
+    'flying': ((0, 9, 12), (1, 5, 8, 11, 17), -1, 'white', 3),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--output',
+        help='file to write the results to as JSON')
+    parser.add_argument(
+        '--compare',
+        help='JSON results of an earlier run to compare against')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='fraction of baseline throughput a run may lose before it '
+        'fails the comparison')
+    parser.add_argument(
+        '--seconds', type=float, default=0.5,
+        help='time spent measuring each throughput')
+    args = parser.parse_args()
+
+    results = run(args.seconds)
+    for name, counts in results['perft'].items():
+        print('perft', name, *counts,
+              '%.2fs' % results['perft_seconds'][name])
+    for name, rate in results['throughput'].items():
+        print('%s %.0f/s' % (name, rate))
+
+    if args.output is not None:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    if args.compare is not None:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        failures = compare(results, baseline, args.threshold)
+        for failure in failures:
+            print('FAIL', failure)
+        if failures:
+            sys.exit(1)
+
+
+def get_board(name):
+    white_points, black_points, turn_num, next_player, _ = positions[name]
+    board = Board()
+    for point in white_points:
+        board.set_player(point, Board.Player.white)
+    for point in black_points:
+        board.set_player(point, Board.Player.black)
+    board.turn_num = turn_num
+    board.next_player = Board.Player[next_player]
+    return board
+
+
+def perft(board, depth):
+
+    # Counts the move sequences of the given length, the way chess move
+    # generators are checked. Won boards end a sequence early and are
+    # not counted.
+
+    if board.get_winner() is not Board.Player.none:
+        return 0
+    if depth == 1:
+        return sum(1 for _ in board.get_move_points())
+
+    count = 0
+    for move_points in list(board.get_move_points()):
+        undo_record = board.apply_points(*move_points)
+        count += perft(board, depth - 1)
+        board.undo(undo_record)
+    return count
+
+
+def measure(function, arguments, seconds):
+    # Calls function on each argument in turn, returns calls per second.
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for argument in arguments:
+            function(argument)
+        calls += len(arguments)
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls / (now - start)
+
+
+def run(seconds=0.5):
+    results = {'perft': {}, 'perft_seconds': {}, 'throughput': {}}
+
+    for name in positions:
+        board = get_board(name)
+        start = time.perf_counter()
+        results['perft'][name] = [
+            perft(board, depth)
+            for depth in range(1, positions[name][-1] + 1)]
+        results['perft_seconds'][name] = time.perf_counter() - start
+
+    boards = [get_board(name) for name in positions]
+    child_lists = [board.get_child_boards() for board in boards]
+    results['throughput'] = {
+        'get_valid_moves': measure(Move.get_valid_moves, boards, seconds),
+        'get_child_boards': measure(
+            Board.get_child_boards, boards, seconds),
+        'get_universal_id': measure(
+            Board.get_universal_id,
+            [child for children in child_lists for child in children],
+            seconds),
+        'deduplicate_boards': measure(
+            Board.deduplicate_boards, child_lists, seconds),
+    }
+    return results
+
+
+def compare(results, baseline, threshold):
+
+    # Returns a description of every perft count that changed and every
+    # throughput that fell below the baseline by more than the threshold.
+
+    failures = []
+    for name, counts in baseline['perft'].items():
+        if results['perft'].get(name) != counts:
+            failures.append('perft %s: %s, baseline %s' % (
+                name, results['perft'].get(name), counts))
+    for name, rate in baseline['throughput'].items():
+        if name not in results['throughput']:
+            failures.append('%s: not measured' % name)
+        elif results['throughput'][name] < rate * (1 - threshold):
+            failures.append('%s: %.0f/s, baseline %.0f/s' % (
+                name, results['throughput'][name], rate))
+    return failures
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import unittest
+
+import benchmark
+from board import Board
+from move import Move
+
+class TestBenchmark(unittest.TestCase):
+    def count_moves(self, board, depth):
+        # Perft through the Move API, as an independent check.
+        if board.get_winner() is not Board.Player.none:
+            return 0
+        moves = Move.get_valid_moves(board)
+        if depth == 1:
+            return len(moves)
+        return sum(self.count_moves(move.get_result(), depth - 1)
+                   for move in moves)
+
+    def test_initial_perft(self):
+        board = Board()
+        self.assertEqual(
+            [benchmark.perft(board, depth) for depth in range(1, 4)],
+            [24, 24 * 23, 24 * 23 * 22])
+        self.assertEqual(board, Board())
+
+    def test_positions(self):
+        for name in benchmark.positions:
+            board = benchmark.get_board(name)
+            with self.subTest(name=name):
+                self.assertEqual(benchmark.perft(board, 2),
+                                 self.count_moves(board, 2))
+
+    def test_compare(self):
+        baseline = {
+            'perft': {'initial': [24, 552]},
+            'throughput': {'get_universal_id': 1000.0},
+        }
+        results = {
+            'perft': {'initial': [24, 552]},
+            'throughput': {'get_universal_id': 950.0},
+        }
+        self.assertEqual(benchmark.compare(results, baseline, 0.1), [])
+
+        results['throughput']['get_universal_id'] = 850.0
+        results['perft']['initial'] = [24, 551]
+        self.assertEqual(len(benchmark.compare(results, baseline, 0.1)), 2)
+
+    def test_measure(self):
+        self.assertGreater(benchmark.measure(len, [[], [1]], 0.01), 0)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
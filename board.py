@@ -2,36 +2,148 @@
 # -*- coding: utf-8 -*-
 
 import collections
-import copy
 from enum import Enum
-import logging
-import sys
+import random
 
-import move
+from move import PackedMove
 
 def main():
-    logging.basicConfig(
-        filename=sys.argv[0] + ".txt",
-        format='%(levelname)s:%(message)s',
-        level=logging.DEBUG,
-        filemode='w')
-
-    processed_board_ids = set()
-    board_list = [Board()]
-    board_index = 0
-
-    while board_index < len(board_list):
-        #logging.debug(board_list[board_index])
-        for new_board in board_list[board_index].get_child_boards():
-            universal_id = new_board.get_universal_id()
-            if universal_id not in processed_board_ids:
-                processed_board_ids.add(universal_id)
-                board_list.append(new_board)
-        board_index += 1
-    for remaining_board in board_list[board_index:]:
-        logging.debug(remaining_board)
-    logging.debug(len(board_list))
-    logging.debug(board_index)
+    # The enumeration lives in its own module, which imports this one.
+    import state_space
+    state_space.main()
+
+
+def _get_mill_masks(ring_size, num_rings, spoke_period):
+    mill_masks = []
+
+    # Ring mills run along each side, from corner to corner.
+    break_interval = max(spoke_period, 2)
+    for ring_index in range(num_rings):
+        for start in range(0, ring_size, break_interval):
+            mill_mask = 0
+            for offset in range(break_interval + 1):
+                ring_position = (start + offset) % ring_size
+                mill_mask |= 1 << (ring_index * ring_size + ring_position)
+            mill_masks.append(mill_mask)
+
+    # Spoke mills cross every ring at the middle of a side.
+    for ring_position in range(spoke_period - 1, ring_size, spoke_period):
+        mill_mask = 0
+        for ring_index in range(num_rings):
+            mill_mask |= 1 << (ring_index * ring_size + ring_position)
+        mill_masks.append(mill_mask)
+
+    return tuple(mill_masks)
+
+
+def _get_point_mills(mill_masks, num_points):
+    return tuple(
+        tuple(mill_mask for mill_mask in mill_masks if mill_mask >> point & 1)
+        for point in range(num_points))
+
+
+def _get_adjacent_points(ring_size, num_rings, spoke_period):
+    adjacent_points = []
+    for ring_index in range(num_rings):
+        for ring_position in range(ring_size):
+            adjacent = [
+                ring_index * ring_size + (ring_position - 1) % ring_size,
+                ring_index * ring_size + (ring_position + 1) % ring_size,
+            ]
+            if ring_position % spoke_period == spoke_period - 1:
+                for spoke_index in (ring_index - 1, ring_index + 1):
+                    if 0 <= spoke_index < num_rings:
+                        adjacent.append(
+                            spoke_index * ring_size + ring_position)
+            adjacent_points.append(tuple(sorted(adjacent)))
+    return tuple(adjacent_points)
+
+
+def _get_adjacent_masks(adjacent_points):
+    return tuple(
+        sum(1 << point for point in adjacent)
+        for adjacent in adjacent_points)
+
+
+def _get_point_map(ring_size, num_rings, transform):
+    point_map = []
+    for ring_index in range(num_rings):
+        for ring_position in range(ring_size):
+            new_ring_index, new_ring_position = \
+                transform(ring_index, ring_position)
+            point_map.append(
+                (new_ring_index % num_rings) * ring_size +
+                new_ring_position % ring_size)
+    return tuple(point_map)
+
+
+def _get_symmetries(ring_size, num_rings, spoke_period):
+    symmetries = [tuple(range(ring_size * num_rings))]
+
+    for offset in range(spoke_period, ring_size, spoke_period):
+        symmetries.append(_get_point_map(
+            ring_size, num_rings,
+            lambda ring_index, ring_position:
+            (ring_index, ring_position + offset)))
+
+    for axis in range(ring_size // 2):
+        symmetries.append(_get_point_map(
+            ring_size, num_rings,
+            lambda ring_index, ring_position:
+            (ring_index, 2 * axis - ring_position)))
+
+    # Swapping the inner and outer rings keeps every mill and adjacency,
+    # so it doubles the group of the square.
+    ring_swap = _get_point_map(
+        ring_size, num_rings,
+        lambda ring_index, ring_position:
+        (num_rings - 1 - ring_index, ring_position))
+    symmetries.extend(
+        tuple(ring_swap[point] for point in point_map)
+        for point_map in symmetries[:])
+
+    return tuple(symmetries)
+
+
+def _get_byte_tables(point_map):
+    # One table per byte of a mask, mapping that byte to its permuted bits.
+    byte_tables = []
+    for shift in range(0, len(point_map), 8):
+        byte_table = []
+        for byte in range(256):
+            permuted_mask = 0
+            for bit in range(min(8, len(point_map) - shift)):
+                if byte >> bit & 1:
+                    permuted_mask |= 1 << point_map[shift + bit]
+            byte_table.append(permuted_mask)
+        byte_tables.append(tuple(byte_table))
+    return tuple(byte_tables)
+
+
+def _get_inverse_symmetries(symmetries):
+    inverse_symmetries = []
+    for point_map in symmetries:
+        inverse_map = tuple(sorted(
+            range(len(point_map)), key=point_map.__getitem__))
+        inverse_symmetries.append(symmetries.index(inverse_map))
+    return tuple(inverse_symmetries)
+
+
+def _get_zobrist_keys(symmetries, turn_count, seed):
+    rng = random.Random(seed)
+    num_points = len(symmetries[0])
+
+    # For every player and point, the key of that piece in each symmetric
+    # image of the board, so all images can be updated together.
+    piece_keys = []
+    for _ in range(2):
+        point_keys = [rng.getrandbits(64) for _ in range(num_points)]
+        piece_keys.append(tuple(
+            tuple(point_keys[point_map[point]] for point_map in symmetries)
+            for point in range(num_points)))
+
+    turn_keys = tuple(rng.getrandbits(64) for _ in range(turn_count))
+    return tuple(piece_keys), turn_keys
 
 
 class Board:
@@ -40,14 +152,61 @@ class Board:
     num_rings = 3
     piece_count = 9
     spoke_period = 2
+    flying_count = 3
 
     Player = Enum('Player', 'none white black')
 
-    def __init__(self):
-        self.rings = list()
+    # Everything needed to restore a board after Board.apply.
+    UndoRecord = collections.namedtuple(
+        'UndoRecord',
+        ('white_mask', 'black_mask', 'zobrist_keys', 'turn_num',
+         'next_player'))
+
+    # The square group holds the rotations and reflections of the board,
+    # the full group adds the inner and outer ring swap.
+    SymmetryGroup = Enum('SymmetryGroup', 'square full')
+    symmetry_group = SymmetryGroup.full
+
+    num_points = ring_size * num_rings
+    full_mask = (1 << num_points) - 1
+
+    # Turns 0 to placement_turns - 1 place a piece, white on even turns.
+    placement_turns = 2 * piece_count
+
+    # Geometry lookup tables, indexed by point.
+    mill_masks = _get_mill_masks(ring_size, num_rings, spoke_period)
+    point_mills = _get_point_mills(mill_masks, num_points)
+    adjacent_points = _get_adjacent_points(
+        ring_size, num_rings, spoke_period)
+    adjacent_masks = _get_adjacent_masks(adjacent_points)
+
+    # Point permutations of the board symmetries, identity first.
+    symmetries = _get_symmetries(ring_size, num_rings, spoke_period)
+    symmetry_tables = tuple(
+        _get_byte_tables(point_map) for point_map in symmetries)
+    symmetry_counts = {
+        SymmetryGroup.square: len(symmetries) // 2,
+        SymmetryGroup.full: len(symmetries),
+    }
+    inverse_symmetries = _get_inverse_symmetries(symmetries)
+
+    # Zobrist keys are seeded so hashes agree between processes and runs.
+    zobrist_piece_keys, zobrist_turn_keys = _get_zobrist_keys(
+        symmetries, 2 * (2 * piece_count + 2), seed=0x9e3779b97f4a7c15)
+    zobrist_empty_keys = (0,) * len(symmetries)
+
+    # Each player's pieces are a bitmask over the points of the board,
+    # where point = ring_index * ring_size + ring_position.
+    # zobrist_keys holds the piece hash of every symmetric image, or None
+    # until a Zobrist hash is first asked for. From then on it is kept
+    # up to date by every change to the board and passed on to copies.
+    __slots__ = ('white_mask', 'black_mask', 'next_player', 'turn_num',
+                 'zobrist_keys')
 
-        for _ in range(self.num_rings):
-            self.rings.append([Board.Player.none] * Board.ring_size)
+    def __init__(self):
+        self.white_mask = 0
+        self.black_mask = 0
+        self.zobrist_keys = None
 
         self.next_player = Board.Player.white
         self.turn_num = 0
@@ -59,19 +218,281 @@ class Board:
         else:
             return self.Player.white
 
+    @property
+    def rings(self):
+        return _Rings(self)
+
+    @classmethod
+    def point_index(cls, ring_index, ring_position):
+        return (int(ring_index) % cls.num_rings) * cls.ring_size + \
+            int(ring_position) % cls.ring_size
+
+    @classmethod
+    def point_coordinates(cls, point):
+        return divmod(point, cls.ring_size)
+
     def is_placing(self):
         return self.turn_num >= 0
 
+    def get_mask(self, player):
+        if player is Board.Player.white:
+            return self.white_mask
+        if player is Board.Player.black:
+            return self.black_mask
+        return self.full_mask & ~(self.white_mask | self.black_mask)
+
+    def get_player(self, point):
+        bit = 1 << point
+        if self.white_mask & bit:
+            return Board.Player.white
+        if self.black_mask & bit:
+            return Board.Player.black
+        return Board.Player.none
+
+    def set_player(self, point, player):
+        old_player = self.get_player(point)
+        if old_player is player:
+            return
+
+        bit = 1 << point
+        if old_player is Board.Player.white:
+            self.white_mask ^= bit
+        elif old_player is Board.Player.black:
+            self.black_mask ^= bit
+
+        if player is Board.Player.white:
+            self.white_mask |= bit
+        elif player is Board.Player.black:
+            self.black_mask |= bit
+
+        if self.zobrist_keys is not None:
+            if old_player is not Board.Player.none:
+                self._toggle_zobrist(point, old_player)
+            if player is not Board.Player.none:
+                self._toggle_zobrist(point, player)
+
+    def set_masks(self, white_mask, black_mask):
+        self.white_mask = white_mask
+        self.black_mask = black_mask
+        self.zobrist_keys = None
+
+    def get_zobrist_keys(self):
+        if self.zobrist_keys is None:
+            self.zobrist_keys = self.zobrist_empty_keys
+            for player in (Board.Player.white, Board.Player.black):
+                for point in self.iter_points(self.get_mask(player)):
+                    self._toggle_zobrist(point, player)
+        return self.zobrist_keys
+
+    def _toggle_zobrist(self, point, player):
+        piece_keys = self.zobrist_piece_keys[player.value - 2][point]
+        self.zobrist_keys = tuple(
+            key ^ piece_key
+            for key, piece_key in zip(self.zobrist_keys, piece_keys))
+
+    def get_zobrist_hash(self, symmetry_group=None):
+
+        # A 64-bit hash that is equal for all symmetric boards.
+        # Unlike the universal ID it is not collision free.
+
+        symmetry_count = self.get_symmetry_count(symmetry_group)
+        return min(self.get_zobrist_keys()[:symmetry_count]) ^ \
+            self._get_turn_key()
+
+    def get_zobrist_canonical(self, symmetry_group=None):
+
+        # Returns the Zobrist hash along with the symmetry whose image
+        # gives it, so moves can be mapped to and from that image.
+
+        symmetry_count = self.get_symmetry_count(symmetry_group)
+        zobrist_keys = self.get_zobrist_keys()
+        symmetry = min(range(symmetry_count), key=zobrist_keys.__getitem__)
+        return zobrist_keys[symmetry] ^ self._get_turn_key(), symmetry
+
+    def _get_turn_key(self):
+        return self.zobrist_turn_keys[
+            2 * (self.turn_num + 1) + self.next_player.value - 2]
+
+    @classmethod
+    def in_mill(cls, mask, point):
+        for mill_mask in cls.point_mills[point]:
+            if mask & mill_mask == mill_mask:
+                return True
+        return False
+
+    def count_pieces(self, player):
+        return self.get_mask(player).bit_count()
+
+    def get_pieces_in_hand(self, player):
+        if not self.is_placing():
+            return 0
+        placed = (self.turn_num + (player is Board.Player.white)) // 2
+        return self.piece_count - placed
+
+    def get_piece_count(self, player):
+
+        # Pieces on the board and still to be placed. Both follow from
+        # the masks and the turn number, so make and unmake keep them
+        # up to date without a counter of their own.
+
+        return self.count_pieces(player) + self.get_pieces_in_hand(player)
+
     def get_player_pieces(self, player):
-        for ring_index in range(self.num_rings):
-            for ring_position in range(self.ring_size):
-                if self.rings[ring_index][ring_position] is player:
-                    yield (ring_index, ring_position)
+        for point in self.iter_points(self.get_mask(player)):
+            yield self.point_coordinates(point)
+
+    @staticmethod
+    def iter_points(mask):
+        while mask:
+            low_bit = mask & -mask
+            yield low_bit.bit_length() - 1
+            mask ^= low_bit
+
+    def is_flying(self):
+        return (not self.is_placing() and
+                self.count_pieces(self.next_player) == self.flying_count)
+
+    def get_shift_points(self):
+
+        # Yields (source_point, target_point) for every legal shift,
+        # using the adjacency masks, or any empty point when flying.
+
+        if self.is_placing():
+            return
+
+        empty_mask = self.get_mask(Board.Player.none)
+        flying = self.is_flying()
+        for source_point in self.iter_points(self.get_mask(self.next_player)):
+            if flying:
+                target_mask = empty_mask
+            else:
+                target_mask = empty_mask & self.adjacent_masks[source_point]
+            for target_point in self.iter_points(target_mask):
+                yield source_point, target_point
+
+    def get_move_points(self, staged=False):
+
+        # Yields (target_point, source_point, mill_point) for every legal
+        # move, expanding a mill into one move per capturable piece.
+        # Staged generation yields all moves that do not close a mill
+        # before expanding any captures.
+
+        player_mask = self.get_mask(self.next_player)
+        opponent_mask = self.get_mask(self.last_player)
+
+        if self.is_placing():
+            candidates = (
+                (None, target_point) for target_point in
+                self.iter_points(self.get_mask(Board.Player.none)))
+        else:
+            candidates = self.get_shift_points()
+
+        mill_moves = []
+        for source_point, target_point in candidates:
+            moved_mask = player_mask | (1 << target_point)
+            if source_point is not None:
+                moved_mask ^= 1 << source_point
+            if self.in_mill(moved_mask, target_point):
+                if staged:
+                    mill_moves.append((target_point, source_point))
+                    continue
+                for mill_point in self.iter_points(opponent_mask):
+                    yield target_point, source_point, mill_point
+            else:
+                yield target_point, source_point, None
+
+        for target_point, source_point in mill_moves:
+            for mill_point in self.iter_points(opponent_mask):
+                yield target_point, source_point, mill_point
+
+    def has_legal_move(self):
+
+        # Equivalent to any(self.get_move_points()), without generating
+        # the moves. Mills only take moves away when the opponent has
+        # no piece left to capture.
+
+        if not self.get_mask(self.last_player):
+            return next(self.get_move_points(), None) is not None
+
+        empty_mask = self.get_mask(Board.Player.none)
+        if self.is_placing() or self.is_flying():
+            return bool(empty_mask)
+        for source_point in self.iter_points(self.get_mask(self.next_player)):
+            if self.adjacent_masks[source_point] & empty_mask:
+                return True
+        return False
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.white_mask = self.white_mask
+        board.black_mask = self.black_mask
+        board.next_player = self.next_player
+        board.turn_num = self.turn_num
+        board.zobrist_keys = self.zobrist_keys
+        return board
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def apply(self, move):
+        if isinstance(move, int):
+            return self.apply_points(*PackedMove.unpack(move))
+
+        target_point = self.point_index(*move.target)
+        source_point = None
+        if move.source is not None:
+            source_point = self.point_index(*move.source)
+        mill_point = None
+        if move.mill_target is not None and move.creates_mill():
+            mill_point = self.point_index(*move.mill_target)
+
+        return self.apply_points(target_point, source_point, mill_point)
+
+    def apply_points(self, target_point, source_point=None, mill_point=None):
+
+        # Plays a move given as point indices without validating it,
+        # and returns the record that Board.undo needs to take it back.
+
+        undo_record = Board.UndoRecord(
+            self.white_mask, self.black_mask, self.zobrist_keys,
+            self.turn_num, self.next_player)
+
+        if source_point is not None:
+            self.set_player(source_point, Board.Player.none)
+        self.set_player(target_point, self.next_player)
+        if mill_point is not None:
+            self.set_player(mill_point, Board.Player.none)
+
+        if self.is_placing():
+            self.turn_num += 1
+            if self.turn_num >= self.placement_turns:
+                self.turn_num = -1
+        self.next_player = self.last_player
+
+        return undo_record
+
+    def undo(self, undo_record):
+        (self.white_mask, self.black_mask, self.zobrist_keys,
+         self.turn_num, self.next_player) = undo_record
 
     def get_child_boards(self):
-        valid_moves = move.Move.get_valid_moves(self)
-        child_boards = [x.get_result() for x in valid_moves]
-        return self.deduplicate_boards(child_boards)
+        return self.deduplicate_boards(self.iter_child_boards())
+
+    def iter_child_boards(self, staged=False):
+
+        # Yields a board per legal move as it is generated, without
+        # merging symmetric children.
+
+        if self.get_winner() is not Board.Player.none:
+            return
+
+        for move_points in self.get_move_points(staged):
+            child_board = self.copy()
+            child_board.apply_points(*move_points)
+            yield child_board
 
     @staticmethod
     def deduplicate_boards(boards):
@@ -83,72 +504,127 @@ class Board:
 
         return list(unique_boards.values())
 
-    def get_universal_id(self):
-        ids = set()
-        ids.add(self.get_unique_id())
-        for board in self.get_equivalent_boards():
-            ids.add(board.get_unique_id())
-        return sorted(ids)[0]
+    def get_universal_id(self, symmetry_group=None):
+        return self.get_canonical(symmetry_group)[0]
+
+    @classmethod
+    def get_symmetry_count(cls, symmetry_group=None):
+        return cls.symmetry_counts[symmetry_group or cls.symmetry_group]
+
+    def get_canonical(self, symmetry_group=None):
+
+        # Returns the smallest unique ID over all symmetric images of the
+        # board, along with the index of the symmetry that produces it.
+
+        white_bytes = self._split_bytes(self.white_mask)
+        black_bytes = self._split_bytes(self.black_mask)
+        symmetry_count = self.get_symmetry_count(symmetry_group)
+
+        canonical_masks = None
+        canonical_symmetry = None
+        for symmetry, byte_tables in enumerate(
+                self.symmetry_tables[:symmetry_count]):
+            white_mask = 0
+            black_mask = 0
+            for byte_table, white_byte, black_byte in zip(
+                    byte_tables, white_bytes, black_bytes):
+                white_mask |= byte_table[white_byte]
+                black_mask |= byte_table[black_byte]
+            masks = (white_mask << self.num_points) | black_mask
+            if canonical_masks is None or masks < canonical_masks:
+                canonical_masks = masks
+                canonical_symmetry = symmetry
+
+        unique_id = (self.turn_num + 1) * len(Board.Player) + \
+            self.next_player.value - 1
+        unique_id = (unique_id << (2 * self.num_points)) | canonical_masks
+        return unique_id, canonical_symmetry
+
+    @classmethod
+    def _split_bytes(cls, mask):
+        return [(mask >> shift) & 0xff
+                for shift in range(0, cls.num_points, 8)]
+
+    @classmethod
+    def permute_mask(cls, mask, symmetry):
+        permuted_mask = 0
+        for byte_table, byte in zip(
+                cls.symmetry_tables[symmetry], cls._split_bytes(mask)):
+            permuted_mask |= byte_table[byte]
+        return permuted_mask
 
     def get_unique_id(self):
 
-        # A unique ID is a perfect hash,
-        # but isn't guaranteed to fit in Py_ssize_t
-
-        unique_id = self.turn_num + 1
-        unique_id = self._combine(unique_id, self.next_player)
-        for ring in self.rings:
-            for place in ring:
-                unique_id = self._combine(unique_id, place)
-
-        return unique_id
-
-    @staticmethod
-    def _combine(original, enum_value):
-        return original * len(type(enum_value)) + enum_value.value - 1
-
-    def get_equivalent_boards(self):
-        equivalent_boards = list()
-
-        for offset in range(self.spoke_period, self.ring_size,
-                            self.spoke_period):
-            equivalent_boards.append(
-                self.get_rotated(offset))
-
-        for offset in range(self.ring_size // 2):
-            equivalent_boards.append(
-                self.get_mirrored(offset))
-
-        return equivalent_boards
+        # A unique ID is a perfect hash that packs the turn, the next
+        # player and both piece masks into a single integer.
+
+        unique_id = (self.turn_num + 1) * len(Board.Player) + \
+            self.next_player.value - 1
+        unique_id = (unique_id << self.num_points) | self.white_mask
+        return (unique_id << self.num_points) | self.black_mask
+
+    @classmethod
+    def from_unique_id(cls, unique_id):
+        board = Board()
+        board.set_masks(
+            (unique_id >> cls.num_points) & cls.full_mask,
+            unique_id & cls.full_mask)
+        turn_index, player_index = divmod(
+            unique_id >> (2 * cls.num_points), len(Board.Player))
+        board.turn_num = turn_index - 1
+        board.next_player = Board.Player(player_index + 1)
+        return board
+
+    def get_equivalent_boards(self, symmetry_group=None):
+        return [self.get_symmetric(symmetry)
+                for symmetry in range(
+                    1, self.get_symmetry_count(symmetry_group))]
+
+    def get_symmetric(self, symmetry):
+        symmetric_board = self.copy()
+        symmetric_board.set_masks(
+            self.permute_mask(self.white_mask, symmetry),
+            self.permute_mask(self.black_mask, symmetry))
+        return symmetric_board
 
     def get_rotated(self, offset):
         #Modulo doesn't play nice here.
         offset = offset % self.ring_size
 
-        rotated_board = copy.deepcopy(self)
-        for (index, ring) in enumerate(rotated_board.rings):
-            rotated_board.rings[index] = ring[-offset:] \
-                + ring[:-offset]
-        return rotated_board
+        return self._get_transformed(
+            lambda ring_index, ring_position:
+            (ring_index, ring_position + offset))
 
     def get_mirrored(self, axis):
-        mirrored_board = copy.deepcopy(self)
-
         axis = axis % self.ring_size
 
-        for rings_index in range(self.num_rings):
-            for offset in range(self.ring_size // 2):
-                positive_offset = (axis + offset) % self.ring_size
-                negative_offset = (axis - offset) % self.ring_size
-                mirrored_board.rings[rings_index][positive_offset] = \
-                    self.rings[rings_index][negative_offset]
-                mirrored_board.rings[rings_index][negative_offset] = \
-                    self.rings[rings_index][positive_offset]
+        return self._get_transformed(
+            lambda ring_index, ring_position:
+            (ring_index, 2 * axis - ring_position))
+
+    def _get_transformed(self, transform):
+        point_map = _get_point_map(self.ring_size, self.num_rings, transform)
 
-        return mirrored_board
+        transformed_board = self.copy()
+        transformed_board.set_masks(
+            self._permute_mask(self.white_mask, point_map),
+            self._permute_mask(self.black_mask, point_map))
+        return transformed_board
+
+    @staticmethod
+    def _permute_mask(mask, point_map):
+        permuted_mask = 0
+        while mask:
+            low_bit = mask & -mask
+            permuted_mask |= 1 << point_map[low_bit.bit_length() - 1]
+            mask ^= low_bit
+        return permuted_mask
 
     def __eq__(self, other):
-        return self.__dict__ == other.__dict__
+        return (self.white_mask == other.white_mask and
+                self.black_mask == other.black_mask and
+                self.next_player is other.next_player and
+                self.turn_num == other.turn_num)
 
     def __repr__(self):
         ret = 'Turn Number:' + str(self.turn_num) + '\n'
@@ -201,21 +677,98 @@ class Board:
         else:
             return '.'
 
+    def is_terminal(self):
+
+        # The game is over when a side is down to two pieces, or when the
+        # side to move is blocked, which loses the game for it.
+
+        return (self.get_winner() is not Board.Player.none or
+                not self.has_legal_move())
+
+    def get_terminal_winner(self):
+        winner = self.get_winner()
+        if winner is Board.Player.none and not self.has_legal_move():
+            return self.last_player
+        return winner
+
     def get_winner(self):
         if self.is_placing():
             return Board.Player.none
 
-        counts = collections.defaultdict(int)
-        for ring in self.rings:
-            for position in ring:
-                counts[position] += 1
-
-        if counts[Board.Player.white] < 3:
+        if self.white_mask.bit_count() < 3:
             return Board.Player.black
-        if counts[Board.Player.black] < 3:
+        if self.black_mask.bit_count() < 3:
             return Board.Player.white
 
         return Board.Player.none
 
+
+class _Rings:
+
+    # List-like view of a board's rings, backed by its bitmasks.
+
+    __slots__ = ('board',)
+
+    def __init__(self, board):
+        self.board = board
+
+    def __len__(self):
+        return self.board.num_rings
+
+    def __getitem__(self, ring_index):
+        if isinstance(ring_index, slice):
+            return [self[index]
+                    for index in range(*ring_index.indices(len(self)))]
+        if not -len(self) <= ring_index < len(self):
+            raise IndexError('ring index out of range')
+        return _Ring(self.board, ring_index % len(self))
+
+    def __setitem__(self, ring_index, places):
+        ring = self[ring_index]
+        for ring_position, place in enumerate(places):
+            ring[ring_position] = place
+
+    def __iter__(self):
+        for ring_index in range(len(self)):
+            yield _Ring(self.board, ring_index)
+
+
+class _Ring:
+
+    # List-like view of a single ring, backed by the board's bitmasks.
+
+    __slots__ = ('board', 'ring_index')
+
+    def __init__(self, board, ring_index):
+        self.board = board
+        self.ring_index = ring_index
+
+    def __len__(self):
+        return self.board.ring_size
+
+    def _point(self, ring_position):
+        if not -len(self) <= ring_position < len(self):
+            raise IndexError('ring position out of range')
+        return self.board.point_index(self.ring_index, ring_position)
+
+    def __getitem__(self, ring_position):
+        if isinstance(ring_position, slice):
+            return [self[index]
+                    for index in range(*ring_position.indices(len(self)))]
+        return self.board.get_player(self._point(ring_position))
+
+    def __setitem__(self, ring_position, player):
+        self.board.set_player(self._point(ring_position), player)
+
+    def __iter__(self):
+        for ring_position in range(len(self)):
+            yield self[ring_position]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
 if __name__ == '__main__':
     main()
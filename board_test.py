@@ -1,5 +1,7 @@
+import random
 import unittest
 from board import Board
+from move import Move
 
 class TestOperations(unittest.TestCase):
     def test_rotate(self):
@@ -50,6 +52,64 @@ class TestOperations(unittest.TestCase):
         self.assertIs(board.next_player, board.Player.black)
         self.assertIs(board.last_player, board.Player.white)
 
+class TestBitboard(unittest.TestCase):
+    def test_rings_view(self):
+        board = Board()
+        board.rings[1][3] = Board.Player.white
+        board.rings[2][-1] = Board.Player.black
+
+        self.assertEqual(board.white_mask, 1 << Board.point_index(1, 3))
+        self.assertEqual(board.black_mask, 1 << Board.point_index(2, 7))
+        self.assertIs(board.rings[1][3], Board.Player.white)
+        self.assertIs(board.rings[2][7], Board.Player.black)
+        self.assertIs(board.rings[0][0], Board.Player.none)
+
+        board.rings[1][3] = Board.Player.none
+        self.assertEqual(board.white_mask, 0)
+
+    def test_player_pieces(self):
+        board = Board()
+        board.rings[2][5] = Board.Player.white
+        board.rings[0][1] = Board.Player.white
+        board.rings[1][1] = Board.Player.black
+
+        self.assertEqual(
+            list(board.get_player_pieces(Board.Player.white)),
+            [(0, 1), (2, 5)])
+        self.assertEqual(
+            list(board.get_player_pieces(Board.Player.black)),
+            [(1, 1)])
+        self.assertEqual(
+            len(list(board.get_player_pieces(Board.Player.none))),
+            Board.num_points - 3)
+        self.assertEqual(board.count_pieces(Board.Player.white), 2)
+
+    def test_copy(self):
+        board = Board()
+        copied = board.copy()
+        copied.rings[0][0] = Board.Player.white
+        copied.turn_num += 1
+
+        self.assertIs(board.rings[0][0], Board.Player.none)
+        self.assertEqual(board.turn_num, 0)
+        self.assertNotEqual(board, copied)
+
+class TestGeometry(unittest.TestCase):
+    def test_mills(self):
+        self.assertEqual(len(Board.mill_masks), 16)
+        for point in range(Board.num_points):
+            self.assertEqual(len(Board.point_mills[point]), 2)
+
+    def test_adjacency(self):
+        self.assertEqual(Board.adjacent_points[Board.point_index(0, 0)],
+                         (Board.point_index(0, 1), Board.point_index(0, 7)))
+        self.assertEqual(Board.adjacent_points[Board.point_index(1, 1)],
+                         (Board.point_index(0, 1), Board.point_index(1, 0),
+                          Board.point_index(1, 2), Board.point_index(2, 1)))
+        for point, adjacent in enumerate(Board.adjacent_points):
+            for adjacent_point in adjacent:
+                self.assertIn(point, Board.adjacent_points[adjacent_point])
+
 class TestIDs(unittest.TestCase):
     def test_empty(self):
         self.assertEqual(
@@ -86,6 +146,274 @@ class TestIDs(unittest.TestCase):
                             original.get_universal_id(),
                             equivalent.get_universal_id())
 
+    def test_canonical_symmetry(self):
+        board = Board()
+        board.rings[0][1] = Board.Player.white
+        board.rings[1][2] = Board.Player.black
+        board.rings[2][6] = Board.Player.white
+
+        universal_id, symmetry = board.get_canonical()
+        self.assertEqual(universal_id, board.get_universal_id())
+        self.assertEqual(
+            board.get_symmetric(symmetry).get_unique_id(), universal_id)
+        for equivalent in board.get_equivalent_boards():
+            self.assertLessEqual(universal_id, equivalent.get_unique_id())
+
+    def test_symmetries_preserve_geometry(self):
+        mill_masks = set(Board.mill_masks)
+        for symmetry in range(len(Board.symmetries)):
+            with self.subTest(symmetry=symmetry):
+                self.assertEqual(
+                    {Board.permute_mask(mill_mask, symmetry)
+                     for mill_mask in Board.mill_masks},
+                    mill_masks)
+                point_map = Board.symmetries[symmetry]
+                for point, adjacent_mask in enumerate(Board.adjacent_masks):
+                    self.assertEqual(
+                        Board.permute_mask(adjacent_mask, symmetry),
+                        Board.adjacent_masks[point_map[point]])
+
+    def test_symmetry_groups(self):
+        self.assertEqual(
+            Board.get_symmetry_count(Board.SymmetryGroup.square), 8)
+        self.assertEqual(
+            Board.get_symmetry_count(Board.SymmetryGroup.full), 16)
+
+        inner = Board()
+        inner.rings[0][1] = Board.Player.white
+        outer = Board()
+        outer.rings[2][1] = Board.Player.white
+
+        self.assertEqual(
+            inner.get_universal_id(Board.SymmetryGroup.full),
+            outer.get_universal_id(Board.SymmetryGroup.full))
+        self.assertNotEqual(
+            inner.get_universal_id(Board.SymmetryGroup.square),
+            outer.get_universal_id(Board.SymmetryGroup.square))
+
+class TestZobrist(unittest.TestCase):
+    def test_incremental(self):
+        board = Board()
+        self.assertIsNone(board.zobrist_keys)
+        board.get_zobrist_keys()
+        board.rings[0][0] = Board.Player.white
+        board.rings[1][3] = Board.Player.black
+        board.rings[0][0] = Board.Player.black
+        board.rings[2][5] = Board.Player.white
+        board.rings[1][3] = Board.Player.none
+
+        rebuilt = board.copy()
+        rebuilt.set_masks(board.white_mask, board.black_mask)
+        self.assertIsNone(rebuilt.zobrist_keys)
+        self.assertEqual(board.zobrist_keys, rebuilt.get_zobrist_keys())
+
+        board.rings[0][0] = Board.Player.none
+        board.rings[2][5] = Board.Player.none
+        self.assertEqual(board.zobrist_keys, Board().get_zobrist_keys())
+
+    def test_symmetric(self):
+        board = Board()
+        board.rings[0][1] = Board.Player.white
+        board.rings[1][4] = Board.Player.black
+        board.rings[2][6] = Board.Player.white
+
+        for equivalent in board.get_equivalent_boards():
+            with self.subTest(equivalent=equivalent):
+                self.assertEqual(board.get_zobrist_hash(),
+                                 equivalent.get_zobrist_hash())
+
+        black_to_move = board.copy()
+        black_to_move.next_player = Board.Player.black
+        self.assertNotEqual(board.get_zobrist_hash(),
+                            black_to_move.get_zobrist_hash())
+
+class TestApply(unittest.TestCase):
+    def test_apply_undo(self):
+        board = Board()
+        for target in ((0, 0), (0, 3), (0, 1), (0, 4)):
+            board.apply(Move(board, target))
+        board.get_zobrist_keys()
+        original = board.copy()
+
+        move = Move(board, (0, 2), mill_target=(0, 3))
+        expected = move.get_result()
+        undo_record = board.apply(move)
+
+        self.assertEqual(board, expected)
+        self.assertEqual(board.zobrist_keys, expected.get_zobrist_keys())
+        self.assertIs(board.rings[0][3], Board.Player.none)
+
+        board.undo(undo_record)
+        self.assertEqual(board, original)
+        self.assertEqual(board.zobrist_keys, original.zobrist_keys)
+        self.assertIs(board.rings[0][3], Board.Player.black)
+
+    def test_end_of_placement(self):
+        board = Board()
+        board.turn_num = Board.placement_turns - 1
+        board.next_player = Board.Player.black
+        undo_record = board.apply(Move(board, (0, 0)))
+
+        self.assertFalse(board.is_placing())
+        self.assertIs(board.next_player, Board.Player.white)
+
+        board.undo(undo_record)
+        self.assertEqual(board.turn_num, Board.placement_turns - 1)
+        self.assertIs(board.next_player, Board.Player.black)
+
+class TestChildBoards(unittest.TestCase):
+    def setUp(self):
+        board = Board()
+        self.board = board
+        board.turn_num = -1
+
+        for ring_position in (0, 1, 3, 5):
+            board.rings[0][ring_position] = Board.Player.white
+        for ring_position in (2, 4, 6, 7):
+            board.rings[1][ring_position] = Board.Player.black
+
+    def assertMatchesMoves(self, board):
+        expected = {move.get_result().get_universal_id()
+                    for move in Move.get_valid_moves(board)}
+        actual = {child.get_universal_id()
+                  for child in board.get_child_boards()}
+        self.assertEqual(actual, expected)
+
+    def test_shifting(self):
+        self.assertMatchesMoves(self.board)
+        self.assertEqual(
+            list(self.board.get_shift_points()),
+            [(Board.point_index(0, 0), Board.point_index(0, 7)),
+             (Board.point_index(0, 1), Board.point_index(0, 2)),
+             (Board.point_index(0, 1), Board.point_index(1, 1)),
+             (Board.point_index(0, 3), Board.point_index(0, 2)),
+             (Board.point_index(0, 3), Board.point_index(0, 4)),
+             (Board.point_index(0, 3), Board.point_index(1, 3)),
+             (Board.point_index(0, 5), Board.point_index(0, 4)),
+             (Board.point_index(0, 5), Board.point_index(0, 6)),
+             (Board.point_index(0, 5), Board.point_index(1, 5))])
+
+    def test_flying(self):
+        self.board.rings[0][0] = Board.Player.none
+        self.assertTrue(self.board.is_flying())
+        self.assertMatchesMoves(self.board)
+        self.assertEqual(
+            len(list(self.board.get_shift_points())),
+            3 * (Board.num_points - 7))
+
+    def test_finished(self):
+        self.board.rings[1][2] = Board.Player.none
+        self.board.rings[1][4] = Board.Player.none
+        self.assertIs(self.board.get_winner(), Board.Player.white)
+        self.assertEqual(self.board.get_child_boards(), [])
+
+    def test_staged(self):
+        move_points = list(self.board.get_move_points())
+        staged = list(self.board.get_move_points(staged=True))
+        self.assertCountEqual(staged, move_points)
+        mills = [mill_point is not None for _, _, mill_point in staged]
+        self.assertEqual(mills, sorted(mills))
+        self.assertTrue(mills[-1])
+
+    def test_iter_child_boards(self):
+        children = self.board.iter_child_boards(staged=True)
+        child = next(children)
+        self.assertEqual(child.count_pieces(Board.Player.black), 4)
+        self.assertEqual(
+            len(list(self.board.iter_child_boards())),
+            len(list(self.board.get_move_points())))
+
+    def test_has_legal_move(self):
+        self.assertTrue(self.board.has_legal_move())
+
+        # White's ring 0 pieces are hemmed in by black on ring 1.
+        blocked = Board()
+        blocked.turn_num = -1
+        for point in (0, 2, 3, 4, 6):
+            blocked.set_player(point, Board.Player.white)
+        for point in (1, 5, 7, 8, 9, 10, 11, 12, 14):
+            blocked.set_player(point, Board.Player.black)
+        self.assertFalse(blocked.has_legal_move())
+        blocked.next_player = Board.Player.black
+        self.assertTrue(blocked.has_legal_move())
+
+        rng = random.Random(0)
+        board = Board()
+        for _ in range(200):
+            move_points = list(board.get_move_points())
+            self.assertEqual(board.has_legal_move(), bool(move_points))
+            if not move_points or \
+                    board.get_winner() is not Board.Player.none:
+                board = Board()
+            else:
+                board.apply_points(*rng.choice(move_points))
+
+class TestPieceCounts(unittest.TestCase):
+    def test_placement(self):
+        board = Board()
+        for player in (Board.Player.white, Board.Player.black):
+            self.assertEqual(board.get_pieces_in_hand(player),
+                             Board.piece_count)
+
+        empty_points = list(Board.iter_points(Board.full_mask))
+        for turn in range(Board.placement_turns):
+            self.assertTrue(board.is_placing())
+            placed = {Board.Player.white: (turn + 1) // 2,
+                      Board.Player.black: turn // 2}
+            for player, count in placed.items():
+                self.assertEqual(board.get_pieces_in_hand(player),
+                                 Board.piece_count - count)
+                self.assertEqual(board.get_piece_count(player),
+                                 Board.piece_count)
+            board = Move.from_points(board, empty_points.pop()).get_result()
+
+        self.assertFalse(board.is_placing())
+        for player in (Board.Player.white, Board.Player.black):
+            self.assertEqual(board.get_pieces_in_hand(player), 0)
+            self.assertEqual(board.get_piece_count(player),
+                             Board.piece_count)
+
+    def test_capture(self):
+        board = Board()
+        for target in ((0, 0), (1, 0), (0, 1), (1, 2)):
+            board = Move(board, target).get_result()
+        board = Move(board, (0, 2), mill_target=(1, 0)).get_result()
+        self.assertEqual(board.get_piece_count(Board.Player.white),
+                         Board.piece_count)
+        self.assertEqual(board.get_piece_count(Board.Player.black),
+                         Board.piece_count - 1)
+        self.assertEqual(board.get_pieces_in_hand(Board.Player.black),
+                         Board.piece_count - 2)
+
+class TestTerminal(unittest.TestCase):
+    def test_placing(self):
+        self.assertFalse(Board().is_terminal())
+        self.assertIs(Board().get_terminal_winner(), Board.Player.none)
+
+    def test_blocked(self):
+        board = Board()
+        board.turn_num = -1
+        for point in (0, 2, 3, 4, 6):
+            board.set_player(point, Board.Player.white)
+        for point in (1, 5, 7, 8, 9, 10, 11, 12, 14):
+            board.set_player(point, Board.Player.black)
+        self.assertIs(board.get_winner(), Board.Player.none)
+        self.assertTrue(board.is_terminal())
+        self.assertIs(board.get_terminal_winner(), Board.Player.black)
+
+        board.next_player = Board.Player.black
+        self.assertFalse(board.is_terminal())
+
+    def test_pieces(self):
+        board = Board()
+        board.turn_num = -1
+        for point in (0, 1):
+            board.set_player(point, Board.Player.white)
+        for point in (8, 9, 10):
+            board.set_player(point, Board.Player.black)
+        self.assertTrue(board.is_terminal())
+        self.assertIs(board.get_terminal_winner(), Board.Player.black)
+
 class TestWinner(unittest.TestCase):
     def setUp(self):
         self.board = Board()
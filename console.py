@@ -1,21 +1,49 @@
+import argparse
 import sys
 
 from board import Board
 from move import Move
+from search import Search
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--engine', choices=('white', 'black'),
+        help='let the engine play this side')
+    parser.add_argument(
+        '--time', type=float, default=1.0,
+        help='seconds the engine may think per move')
+    args = parser.parse_args()
+
     board = Board()
+    engine_player = None
+    if args.engine:
+        engine_player = Board.Player[args.engine]
+    search = Search()
 
-    while board.get_winner() is Board.Player.none:
+    while not board.is_terminal():
         print(board)
-        board = get_move(board).get_result()
+        if board.next_player is engine_player:
+            result = search.search(board, time_limit=args.time)
+            move = Move.from_packed(board, result.move)
+            print("Engine plays", move, "score", result.score)
+        else:
+            move = get_move(board)
+        board = move.get_result()
+
+    print(board)
+    print("Winner:", board.get_terminal_winner().name)
 
 def get_move(board):
     move = None
 
     while not move:
+        source = None
+        if not board.is_placing():
+            print("Move source:")
+            source = get_pair()
         print("Move location:")
-        move = Move(board, get_pair())
+        move = Move(board, get_pair(), source)
         if move.creates_mill():
             print("Specify mill target")
             move.mill_target = get_pair()
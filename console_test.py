@@ -0,0 +1,40 @@
+import contextlib
+import io
+import sys
+import unittest
+
+from board import Board
+import console
+
+class TestConsole(unittest.TestCase):
+    def get_move(self, board, lines):
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(''.join(line + '\n' for line in lines))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return console.get_move(board)
+        finally:
+            sys.stdin = stdin
+
+    def test_placement(self):
+        move = self.get_move(Board(), ['1 2'])
+        self.assertEqual(move.target, (1, 2))
+        self.assertIsNone(move.source)
+
+    def test_movement(self):
+        board = Board()
+        board.turn_num = -1
+        for point in (0, 1, 9, 12):
+            board.set_player(point, Board.Player.white)
+        for point in (2, 8, 17, 20):
+            board.set_player(point, Board.Player.black)
+
+        # The first move is not to an adjacent point and is asked again.
+
+        move = self.get_move(board, ['0 0', '0 3', '0 0', '0 7'])
+        self.assertEqual(move.source, (0, 0))
+        self.assertEqual(move.target, (0, 7))
+        self.assertTrue(move.is_valid())
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
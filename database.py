@@ -0,0 +1,147 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from board import Board
+import ranking
+from solver import Solver
+
+# An endgame database is a directory with one file per movement phase
+# class, where the side to move has white_count pieces and the other side
+# black_count. A file is a fixed header followed by one entry per position,
+# in the order of ranking.rank_masks:
+#
+#   values:    2 bits per position, four to a byte, lowest bits first,
+#              holding a Solver.Value code or unknown.
+#   distances: 2 bytes per position, little endian, 0 for a draw,
+#              otherwise the distance to the end of the game plus one.
+#              Wins are an odd number of plies away and losses an even
+#              number, so the distance also gives the value.
+
+_header = struct.Struct('<4sBBBBQ')
+_magic = b'NMMD'
+_version = 2
+
+encodings = ('values', 'distances')
+unknown_value = 3
+max_distance = 0xfffe
+
+
+def get_path(directory, white_count, black_count):
+    return os.path.join(
+        directory, 'w%d_b%d.nmmdb' % (white_count, black_count))
+
+
+def write_class(directory, position_class, values, distances,
+                encoding='values'):
+    white_count, black_count = position_class
+
+    values = np.asarray(values, dtype=np.uint8)
+
+    if encoding == 'values':
+        padded = np.zeros(-(-len(values) // 4) * 4, dtype=np.uint8)
+        padded[:len(values)] = values
+        payload = (padded[0::4] | padded[1::4] << 2 |
+                   padded[2::4] << 4 | padded[3::4] << 6).tobytes()
+    else:
+        distances = np.where(
+            values != 0, np.asarray(distances, dtype=np.int64), -1)
+        if len(distances) and distances.max() > max_distance:
+            raise OverflowError(
+                'distance %d does not fit in the database' %
+                distances.max())
+        payload = (distances + 1).astype('<u2').tobytes()
+
+    with open(get_path(directory, white_count, black_count), 'wb') as file:
+        file.write(_header.pack(
+            _magic, _version, encodings.index(encoding),
+            white_count, black_count, len(values)))
+        file.write(payload)
+
+
+def write(directory, solver, encoding='values'):
+    os.makedirs(directory, exist_ok=True)
+    for position_class, (values, distances) in solver.tables.items():
+        write_class(directory, position_class, values, distances, encoding)
+
+
+class Database:
+
+    # Looks positions up through read-only memory maps, so a probe touches
+    # a single page and processes share the page cache.
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._classes = {}
+
+    def close(self):
+        for class_file, _, _ in self._classes.values():
+            if class_file is not None:
+                class_file.close()
+        self._classes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open_class(self, white_count, black_count):
+        path = get_path(self.directory, white_count, black_count)
+        if not os.path.exists(path):
+            return None, None, None
+
+        with open(path, 'rb') as file:
+            class_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, encoding, _, _, _ = _header.unpack_from(class_file)
+        if magic != _magic or version != _version:
+            class_file.close()
+            raise ValueError('%s is not a version %d database file' %
+                             (path, _version))
+        return class_file, encodings[encoding], _header.size
+
+    def probe(self, board):
+
+        # Returns (Solver.Value, distance) for the side to move, or None if
+        # the position is not in the database. The distance is None for
+        # draws and for files that only hold values.
+
+        if board.is_placing():
+            return None
+        return self.probe_masks(
+            board.get_mask(board.next_player),
+            board.get_mask(board.last_player))
+
+    def probe_masks(self, mover_mask, opponent_mask):
+        mover_count = mover_mask.bit_count()
+        opponent_count = opponent_mask.bit_count()
+        if mover_count < Board.flying_count:
+            return Solver.Value.loss, 0
+        if opponent_count < Board.flying_count:
+            return Solver.Value.win, 0
+
+        position_class = (mover_count, opponent_count)
+        if position_class not in self._classes:
+            self._classes[position_class] = self._open_class(*position_class)
+        class_file, encoding, offset = self._classes[position_class]
+        if class_file is None:
+            return None
+
+        index = ranking.rank_masks(mover_mask, opponent_mask)
+        if encoding == 'values':
+            value = class_file[offset + (index >> 2)] >> \
+                ((index & 3) * 2) & 3
+            if value == unknown_value:
+                return None
+            return Solver.Value(value), None
+
+        distance = int.from_bytes(
+            class_file[offset + 2 * index:offset + 2 * index + 2], 'little')
+        if not distance:
+            return Solver.Value.draw, None
+        distance -= 1
+        if distance & 1:
+            return Solver.Value.win, distance
+        return Solver.Value.loss, distance
@@ -0,0 +1,83 @@
+import array
+import random
+import tempfile
+import unittest
+
+from board import Board
+import ranking
+
+try:
+    import numpy
+    import database
+    from solver import Solver
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestDatabase(unittest.TestCase):
+    position_class = (3, 3)
+
+    def setUp(self):
+        size = ranking.get_class_size(ranking.PositionClass(
+            *self.position_class, -1, Board.Player.white))
+        rng = random.Random(0)
+
+        values = bytearray(size)
+        distances = array.array('H', [Solver.no_distance]) * size
+        for index in rng.sample(range(size), 2000):
+            value = rng.choice(list(Solver.Value))
+            values[index] = value.value
+            if value is Solver.Value.win:
+                distances[index] = rng.randrange(1, 600, 2)
+            elif value is Solver.Value.loss:
+                distances[index] = rng.randrange(0, 600, 2)
+
+        self.solver = Solver(3)
+        self.solver.tables[self.position_class] = (values, distances)
+        self.indices = [index for index in range(size) if values[index]]
+        self.indices += rng.sample(range(size), 100)
+
+    def check(self, encoding):
+        with tempfile.TemporaryDirectory() as directory:
+            database.write(directory, self.solver, encoding)
+            with database.Database(directory) as endgames:
+                for index in self.indices:
+                    board = ranking.unrank(ranking.PositionClass(
+                        *self.position_class, -1, Board.Player.white),
+                        index)
+                    value, distance = self.solver.get_value(board)
+                    if encoding == 'values':
+                        distance = None
+                    self.assertEqual(endgames.probe(board), (value, distance))
+
+                    swapped = board.copy()
+                    swapped.set_masks(board.black_mask, board.white_mask)
+                    swapped.next_player = Board.Player.black
+                    self.assertEqual(endgames.probe(swapped),
+                                     (value, distance))
+
+    def test_values(self):
+        self.check('values')
+
+    def test_distances(self):
+        self.check('distances')
+
+    def test_overflow(self):
+        values, distances = self.solver.tables[self.position_class]
+        values[0] = Solver.Value.win.value
+        distances[0] = database.max_distance + 1
+        with tempfile.TemporaryDirectory() as directory:
+            database.write(directory, self.solver, 'values')
+            with self.assertRaises(OverflowError):
+                database.write(directory, self.solver, 'distances')
+
+    def test_missing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with database.Database(directory) as endgames:
+                board = ranking.unrank(ranking.PositionClass(
+                    4, 3, -1, Board.Player.white), 0)
+                self.assertIsNone(endgames.probe(board))
+                self.assertIsNone(endgames.probe(Board()))
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,183 @@
+import contextlib
+import cProfile
+import functools
+import inspect
+import sys
+import time
+
+from board import Board
+from move import Move, PackedMove
+
+# Counts and times calls to the hot paths of Board and Move. Nothing is
+# wrapped until enable is called, so the disabled cost is zero. Counts
+# are kept per process, so work done by pool workers is not included.
+
+# Move generation, mill checks, copies, canonicalization and dedup.
+targets = (
+    (Board, 'get_move_points'),
+    (Board, 'get_shift_points'),
+    (Move, 'get_valid_moves'),
+    (PackedMove, 'get_moves'),
+    (Board, 'get_child_boards'),
+    (Board, 'in_mill'),
+    (Move, 'creates_mill'),
+    (Board, 'copy'),
+    (Board, 'get_canonical'),
+    (Board, 'deduplicate_boards'),
+)
+
+
+class Stat:
+
+    __slots__ = ('calls', 'seconds', 'hits', 'misses')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.hits = 0
+        self.misses = 0
+
+
+stats = {}
+_originals = []
+
+
+def enable(extra_targets=()):
+
+    # extra_targets are further (class, attribute) pairs to wrap, such
+    # as (state_space.Enumeration, 'add_child').
+
+    if _originals:
+        return
+    for cls, name in targets + tuple(extra_targets):
+        function = cls.__dict__[name]
+        stat = stats.setdefault('%s.%s' % (cls.__name__, name), Stat())
+        wrap = _wrappers.get(name, _wrap)
+        if isinstance(function, (classmethod, staticmethod)):
+            wrapper = type(function)(wrap(function.__func__, stat))
+        else:
+            wrapper = wrap(function, stat)
+        _originals.append((cls, name, function))
+        setattr(cls, name, wrapper)
+
+
+def disable():
+    while _originals:
+        cls, name, function = _originals.pop()
+        setattr(cls, name, function)
+
+
+def reset():
+    for stat in stats.values():
+        stat.__init__()
+
+
+def _wrap(function, stat):
+    if inspect.isgeneratorfunction(function):
+        return _wrap_generator(function, stat)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stat.calls += 1
+            stat.seconds += time.perf_counter() - start
+    return wrapper
+
+
+def _wrap_generator(function, stat):
+
+    # Only the time spent producing items is counted, not the time the
+    # caller spends between them.
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        stat.calls += 1
+        iterator = function(*args, **kwargs)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stat.seconds += time.perf_counter() - start
+                return
+            stat.seconds += time.perf_counter() - start
+            yield item
+    return wrapper
+
+
+def _wrap_deduplicate(function, stat):
+    timed = _wrap(function, stat)
+
+    @functools.wraps(function)
+    def wrapper(boards):
+        boards = list(boards)
+        unique_boards = timed(boards)
+        stat.misses += len(unique_boards)
+        stat.hits += len(boards) - len(unique_boards)
+        return unique_boards
+    return wrapper
+
+
+def _wrap_add_child(function, stat):
+    timed = _wrap(function, stat)
+
+    @functools.wraps(function)
+    def wrapper(child_layer, key, child_id):
+        if key in child_layer:
+            stat.hits += 1
+        else:
+            stat.misses += 1
+        return timed(child_layer, key, child_id)
+    return wrapper
+
+
+# Wrappers that also count dedup hits and misses.
+_wrappers = {
+    'deduplicate_boards': _wrap_deduplicate,
+    'add_child': _wrap_add_child,
+}
+
+
+def get_summary():
+    lines = ['%-34s %10s %10s %10s %10s %10s' % (
+        'function', 'calls', 'seconds', 'us/call', 'hits', 'misses')]
+    for name, stat in sorted(
+            stats.items(), key=lambda item: -item[1].seconds):
+        if not stat.calls:
+            continue
+        lines.append('%-34s %10d %10.3f %10.2f %10s %10s' % (
+            name, stat.calls, stat.seconds,
+            1e6 * stat.seconds / stat.calls,
+            stat.hits if stat.hits or stat.misses else '',
+            stat.misses if stat.hits or stat.misses else ''))
+    return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def session(counters=False, profile_path=None, extra_targets=(),
+            stream=None):
+
+    # Collects counters, a cProfile profile or both while the block
+    # runs, then prints the counter summary and writes the profile in
+    # pstats format.
+
+    profiler = None
+    if counters:
+        reset()
+        enable(extra_targets)
+    if profile_path is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        if counters:
+            disable()
+            print(get_summary(), file=stream or sys.stderr)
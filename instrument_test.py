@@ -0,0 +1,58 @@
+import io
+import os
+import pstats
+import tempfile
+import unittest
+
+from board import Board
+import instrument
+from move import Move
+
+class TestInstrument(unittest.TestCase):
+    def tearDown(self):
+        instrument.disable()
+
+    def test_disabled(self):
+        originals = {name: Board.__dict__[name]
+                     for _, name in instrument.targets
+                     if name in Board.__dict__}
+        instrument.enable()
+        self.assertIsNot(Board.__dict__['copy'], originals['copy'])
+        instrument.disable()
+        for name, function in originals.items():
+            self.assertIs(Board.__dict__[name], function)
+
+    def test_counts(self):
+        board = Move(Board(), (0, 0)).get_result()
+        expected_moves = list(board.get_move_points())
+
+        instrument.enable()
+        instrument.reset()
+        self.assertEqual(list(board.get_move_points()), expected_moves)
+        children = board.get_child_boards()
+        Board.deduplicate_boards(children + children[:3])
+        instrument.disable()
+
+        stats = instrument.stats
+        self.assertEqual(stats['Board.get_move_points'].calls, 2)
+        self.assertEqual(stats['Board.get_child_boards'].calls, 1)
+        self.assertEqual(stats['Board.copy'].calls, len(expected_moves))
+        self.assertEqual(stats['Board.deduplicate_boards'].hits,
+                         len(expected_moves) - len(children) + 3)
+        self.assertEqual(stats['Board.deduplicate_boards'].misses,
+                         2 * len(children))
+        self.assertGreater(stats['Board.get_canonical'].seconds, 0)
+        self.assertIn('Board.get_canonical', instrument.get_summary())
+
+    def test_session(self):
+        stream = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            profile_path = os.path.join(directory, 'profile')
+            with instrument.session(True, profile_path, stream=stream):
+                Board().get_child_boards()
+            self.assertGreater(pstats.Stats(profile_path).total_calls, 0)
+        self.assertIn('Board.get_child_boards', stream.getvalue())
+        self.assertNotIn('wrapper', Board.get_child_boards.__code__.co_name)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
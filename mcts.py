@@ -0,0 +1,157 @@
+from collections import namedtuple
+import math
+import multiprocessing
+import random
+import time
+
+from board import Board
+from move import PackedMove
+import playout
+
+MCTSResult = namedtuple(
+    "MCTSResult", ("move", "playouts", "visits", "rewards"))
+
+
+class MCTS:
+
+    # Monte Carlo tree search with UCT selection. With several processes
+    # each worker grows an independent tree from the same root and only
+    # the visit counts and rewards of the root moves are merged, so the
+    # workers never have to talk to each other while searching.
+    #
+    # Rewards are counted for the player who made the move into a node:
+    # 1 for a win, 0.5 for a draw and 0 for a loss. Games that are still
+    # running after max_playout_plies are scored as draws.
+
+    exploration = math.sqrt(2)
+    max_playout_plies = playout.default_max_plies
+
+    def __init__(self, playouts=1000, time_limit=None, processes=1,
+                 seed=None):
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.processes = processes
+        self.seed = seed
+
+    def search(self, board, pool=None):
+        if self.seed is None:
+            seed = random.randrange(1 << 32)
+        else:
+            seed = self.seed
+
+        if self.processes == 1 and pool is None:
+            results = [_search_tree(
+                board.get_unique_id(), self.playouts, self.time_limit, seed)]
+        else:
+            tasks = []
+            for worker in range(self.processes):
+                playouts = None
+                if self.playouts is not None:
+                    playouts = -(-self.playouts // self.processes)
+                tasks.append((board.get_unique_id(), playouts,
+                              self.time_limit, seed + worker))
+            if pool is None:
+                with multiprocessing.Pool(self.processes) as pool:
+                    results = pool.starmap(_search_tree, tasks)
+            else:
+                results = pool.starmap(_search_tree, tasks)
+
+        playouts = 0
+        visits = {}
+        rewards = {}
+        for tree_playouts, tree_visits, tree_rewards in results:
+            playouts += tree_playouts
+            for packed_move, count in tree_visits.items():
+                visits[packed_move] = visits.get(packed_move, 0) + count
+                rewards[packed_move] = rewards.get(packed_move, 0) + \
+                    tree_rewards[packed_move]
+
+        best_move = None
+        if visits:
+            best_move = max(visits, key=lambda move: (visits[move], move))
+        return MCTSResult(best_move, playouts, visits, rewards)
+
+    @classmethod
+    def grow(cls, root, board, rng):
+
+        # Runs one playout: selects a leaf with UCT, expands one of its
+        # moves, plays the game out at random and backs the result up.
+
+        node = root
+        board = board.copy()
+        while not node.untried_moves and node.children:
+            node = cls.select_child(node)
+            board.apply(node.move)
+
+        if node.untried_moves:
+            packed_move = node.untried_moves.pop(
+                rng.randrange(len(node.untried_moves)))
+            player = board.next_player
+            board.apply(packed_move)
+            child = Node(packed_move, player, board, node)
+            node.children.append(child)
+            node = child
+
+        winner = cls.play_out(board, rng)
+
+        while node is not None:
+            node.visits += 1
+            if winner is node.player:
+                node.reward += 1
+            elif winner is Board.Player.none:
+                node.reward += 0.5
+            node = node.parent
+
+    @classmethod
+    def select_child(cls, node):
+        log_visits = math.log(node.visits)
+        return max(
+            node.children,
+            key=lambda child: child.reward / child.visits +
+            cls.exploration * math.sqrt(log_visits / child.visits))
+
+    @classmethod
+    def play_out(cls, board, rng):
+        winner, _ = playout.play_out(board, rng, cls.max_playout_plies)
+        return winner
+
+class Node:
+
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried_moves',
+                 'visits', 'reward')
+
+    def __init__(self, move, player, board, parent=None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        self.reward = 0
+
+        if board.get_winner() is Board.Player.none:
+            self.untried_moves = PackedMove.get_moves(board)
+        else:
+            self.untried_moves = []
+
+
+def _search_tree(board_id, playouts, time_limit, seed):
+    board = Board.from_unique_id(board_id)
+    rng = random.Random(seed)
+    root = Node(None, board.last_player, board)
+
+    deadline = None
+    if time_limit is not None:
+        deadline = time.monotonic() + time_limit
+
+    count = 0
+    while root.untried_moves or root.children:
+        if playouts is not None and count >= playouts:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        MCTS.grow(root, board, rng)
+        count += 1
+
+    visits = {child.move: child.visits for child in root.children}
+    rewards = {child.move: child.reward for child in root.children}
+    return count, visits, rewards
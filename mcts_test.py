@@ -0,0 +1,58 @@
+import unittest
+
+from board import Board
+from mcts import MCTS
+from move import PackedMove
+
+class TestMCTS(unittest.TestCase):
+    def get_winning_board(self):
+        # White closes the ring 0 mill by moving from (0, 3) to (0, 2)
+        # and takes one of black's three pieces.
+        board = Board()
+        board.turn_num = -1
+        for point in (Board.point_index(0, 0), Board.point_index(0, 1),
+                      Board.point_index(0, 3), Board.point_index(2, 6)):
+            board.set_player(point, Board.Player.white)
+        for point in (Board.point_index(1, 4), Board.point_index(2, 0),
+                      Board.point_index(2, 4)):
+            board.set_player(point, Board.Player.black)
+        return board
+
+    def test_winning_move(self):
+        board = self.get_winning_board()
+        result = MCTS(playouts=300, seed=0).search(board)
+        target, source, mill = PackedMove.unpack(result.move)
+        self.assertEqual(target, Board.point_index(0, 2))
+        self.assertEqual(source, Board.point_index(0, 3))
+        self.assertIsNotNone(mill)
+        self.assertEqual(result.rewards[result.move],
+                         result.visits[result.move])
+
+    def test_statistics(self):
+        result = MCTS(playouts=50, seed=0).search(Board())
+        self.assertEqual(result.playouts, 50)
+        self.assertEqual(sum(result.visits.values()), 50)
+        self.assertEqual(
+            result, MCTS(playouts=50, seed=0).search(Board()))
+
+    def test_root_parallel(self):
+        result = MCTS(playouts=40, processes=2, seed=0).search(Board())
+        self.assertEqual(result.playouts, 40)
+        self.assertEqual(sum(result.visits.values()), 40)
+        self.assertEqual(
+            result.visits[result.move], max(result.visits.values()))
+
+    def test_time_limit(self):
+        result = MCTS(playouts=None, time_limit=0.2, seed=0).search(
+            self.get_winning_board())
+        self.assertGreater(result.playouts, 0)
+
+    def test_finished_game(self):
+        board = self.get_winning_board()
+        board.set_player(Board.point_index(1, 4), Board.Player.none)
+        result = MCTS(playouts=10, seed=0).search(board)
+        self.assertIsNone(result.move)
+        self.assertEqual(result.playouts, 0)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -1,5 +1,3 @@
-import copy
-import math
 from collections import namedtuple
 
 class Move:
@@ -82,172 +80,85 @@ class Move:
         if self.board.is_placing():
             return False
 
-        if self._get_player(self.source) != self.board.next_player:
-            return False
-
-        if self._get_player(self.target) != self.board.Player.none:
-            return False
-
-        if self.source.ring_index == self.target.ring_index:
-            distance = self.source.ring_position - self.target.ring_position
-            distance = abs(distance)
-            if distance in (1, 7):
-                return True
-        elif self.source.ring_position == self.target.ring_position:
-            spoke_offset = self.board.spoke_period - 1
-            target_spoke_offset = \
-                self.target.ring_position % self.board.spoke_period
-            if spoke_offset == target_spoke_offset:
-                return True
-        return False
-
-    def creates_mill(self):
-        if not self._is_valid_move():
+        if self.source is None:
             return False
-        if self._creates_spoke_mill():
-            return True
-        if self._creates_ring_mill():
-            return True
 
-        return False
-
-    def _creates_spoke_mill(self):
-
-        if (self.source and
-                self.target.ring_position == self.source.ring_position):
+        if self._get_player(self.source) != self.board.next_player:
             return False
 
-        spoke_offset = self.board.spoke_period - 1
-        target_spoke_offset = \
-            self.target.ring_position % self.board.spoke_period
-
-        if target_spoke_offset != spoke_offset:
+        if self._get_player(self.target) != self.board.Player.none:
             return False
 
-        for ring_index, ring in enumerate(self.board.rings):
-            if ring_index == self.target.ring_index:
-                continue
-            elif ring[self.target.ring_position] != self.board.next_player:
-                break
-        else:
-            return True
-
-        return False
-
-    def _creates_ring_mill(self):
-        break_interval = max(self.board.spoke_period, 2)
-
-        # If target.ring_position is on a corner, then start != mid != end
-        start = (self.target.ring_position - 1) % self.board.ring_size
-        start = (start // break_interval) * break_interval
-        mid = (self.target.ring_position // break_interval) * break_interval
-        end = float(self.target.ring_position + 1) / break_interval
-        end = int(math.ceil(end) * break_interval) % self.board.ring_size
-
-        if self._search_for_ring_mill(start, mid):
+        if self.board.is_flying():
             return True
-        if self._search_for_ring_mill(mid, end):
-            return True
-
-        return False
 
-    def _search_for_ring_mill(self, from_index, to_index):
-        ring = self.board.rings[self.target.ring_index]
-        index = from_index
+        source_point = self.board.point_index(*self.source)
+        target_point = self.board.point_index(*self.target)
+        adjacent_mask = self.board.adjacent_masks[source_point]
+        return bool(adjacent_mask >> target_point & 1)
 
-        if from_index == to_index:
+    def creates_mill(self):
+        if not self._is_valid_move():
             return False
 
-        while True:
-            if (index != self.target.ring_position and
-                    ring[index] != self.board.next_player):
-                break
-            if (self.source is not None and
-                    self.source.ring_index == self.target.ring_index and
-                    index == self.source.ring_position):
-                return False
-            if index == to_index:
-                return True
-            index = (index + 1) % self.board.ring_size
+        target_point = self.board.point_index(*self.target)
+        player_mask = self.board.get_mask(self.board.next_player)
+        player_mask |= 1 << target_point
+        if self.source is not None:
+            player_mask &= ~(1 << self.board.point_index(*self.source))
 
-        return False
+        return self.board.in_mill(player_mask, target_point)
 
     @staticmethod
     def get_valid_moves(board):
-        opponent_coordinates = tuple(
-            board.get_player_pieces(board.last_player))
-        mill_moves = []
-        for valid_move in Move._get_valid_moves(board):
-            if valid_move.creates_mill():
-                for opponent_coordinate in opponent_coordinates:
-                    mill_move = copy.deepcopy(valid_move)
-                    mill_move.mill_target = opponent_coordinate
-                    mill_moves.append(mill_move)
-            else:
-                mill_moves.append(valid_move)
-
-        return mill_moves
+        return list(Move.iter_valid_moves(board))
 
     @staticmethod
-    def _get_valid_moves(board):
-        if board.is_placing():
-            valid_moves = Move._get_valid_placements(board)
-        else:
-            valid_moves = Move._get_valid_shifts(board)
-
-        return valid_moves
+    def iter_valid_moves(board, with_results=False, staged=False):
+
+        # Yields the legal moves one at a time, or (move, result) pairs,
+        # so callers that stop early build nothing for the rest. Staged
+        # generation yields the moves that close a mill last.
+
+        for move_points in board.get_move_points(staged):
+            move = Move.from_points(board, *move_points)
+            if with_results:
+                result = board.copy()
+                result.apply_points(*move_points)
+                yield move, result
+            else:
+                yield move
 
     @staticmethod
-    def _get_valid_placements(board):
-        for target in board.get_player_pieces(board.Player.none):
-            yield Move(board, target)
+    def from_points(board, target_point, source_point=None, mill_point=None):
+        return Move(
+            board,
+            board.point_coordinates(target_point),
+            Move._point_coordinates(board, source_point),
+            Move._point_coordinates(board, mill_point))
 
     @staticmethod
-    def _get_valid_shifts(board):
-        for source in board.get_player_pieces(board.next_player):
-            for target in Move._get_valid_shift_targets(board, source):
-                yield Move(board, target, source)
+    def _point_coordinates(board, point):
+        if point is None:
+            return None
+        return board.point_coordinates(point)
 
     @staticmethod
-    def _get_valid_shift_targets(board, source):
-        for offset in (-1, 1):
-            target = (source[0] + offset, source[1])
-            if target[0] > 0 and target[0] < board.num_rings:
-                move = Move(board, target, source)
-                if move._is_valid_move():
-                    yield target
-
-            target = (source[0], source[1] + offset)
-            move = Move(board, target, source)
-            if move._is_valid_move():
-                yield target
-
-    def get_result(self):
-        if self.board.is_placing():
-            return self._get_placement_result()
-
-        return None
+    def from_packed(board, packed_move):
+        return Move.from_points(board, *PackedMove.unpack(packed_move))
 
-    def _get_placement_result(self):
-        assert self.board.is_placing()
+    def to_packed(self):
+        return PackedMove.pack(*(
+            None if position is None else self.board.point_index(*position)
+            for position in (self.target, self.source, self.mill_target)))
 
-        new_board = copy.deepcopy(self.board)
-        new_board.rings[self.target.ring_index][self.target.ring_position] = \
-            new_board.next_player
-        new_board.turn_num += 1
-
-        if self.creates_mill():
-            new_board.rings \
-                [self.mill_target.ring_index] \
-                [self.mill_target.ring_position] = self.board.Player.none
-
-        if new_board.turn_num > (new_board.piece_count * 2):
-            new_board.turn_num = -1
-        new_board.next_player = self.board.last_player
+    def get_result(self):
+        new_board = self.board.copy()
+        new_board.apply(self)
         return new_board
 
     def _get_player(self, position):
-        return self.board.rings[position.ring_index][position.ring_position]
+        return self.board.get_player(self.board.point_index(*position))
 
     def __str__(self):
         return (
@@ -262,3 +173,55 @@ class Move:
 
     def __eq__(self, other):
         return self.__dict__ == other.__dict__
+
+
+class PackedMove:
+
+    # A move packed into a small int that holds the target, source and
+    # mill target point indices, independent of any board.
+
+    point_bits = 5
+    none = (1 << point_bits) - 1
+
+    @staticmethod
+    def pack(target_point, source_point=None, mill_point=None):
+        if source_point is None:
+            source_point = PackedMove.none
+        if mill_point is None:
+            mill_point = PackedMove.none
+        return (target_point |
+                source_point << PackedMove.point_bits |
+                mill_point << (2 * PackedMove.point_bits))
+
+    @staticmethod
+    def unpack(packed_move):
+        target_point = packed_move & PackedMove.none
+        source_point = (packed_move >> PackedMove.point_bits) & \
+            PackedMove.none
+        mill_point = packed_move >> (2 * PackedMove.point_bits)
+        return (
+            target_point,
+            None if source_point == PackedMove.none else source_point,
+            None if mill_point == PackedMove.none else mill_point)
+
+    @staticmethod
+    def permute(packed_move, point_map):
+        return PackedMove.pack(*(
+            None if point is None else point_map[point]
+            for point in PackedMove.unpack(packed_move)))
+
+    @staticmethod
+    def get_moves(board):
+        pack = PackedMove.pack
+        return [pack(*move_points) for move_points in board.get_move_points()]
+
+    @staticmethod
+    def iter_moves(board, staged=False):
+        pack = PackedMove.pack
+        for move_points in board.get_move_points(staged):
+            yield pack(*move_points)
+
+    @staticmethod
+    def to_string(packed_move):
+        return "PackedMove(target(%s) source(%s) mill_target(%s))" % \
+            PackedMove.unpack(packed_move)
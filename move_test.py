@@ -1,7 +1,7 @@
 import unittest
 
 from board import Board
-from move import Move
+from move import Move, PackedMove
 
 class TestEquality(unittest.TestCase):
     def test_equal(self):
@@ -14,6 +14,39 @@ class TestEquality(unittest.TestCase):
         self.assertEqual(first, second)
         self.assertNotEqual(first, third)
 
+class TestPackedMove(unittest.TestCase):
+    def test_round_trip(self):
+        for move_points in ((0, None, None), (23, 22, None), (5, 4, 17),
+                            (9, None, 0)):
+            with self.subTest(move_points=move_points):
+                self.assertEqual(
+                    PackedMove.unpack(PackedMove.pack(*move_points)),
+                    move_points)
+
+    def test_conversion(self):
+        board = Board()
+        move = Move(board, (1, 2), (0, 2), (2, 7))
+        packed_move = move.to_packed()
+
+        self.assertIsInstance(packed_move, int)
+        self.assertEqual(Move.from_packed(board, packed_move), move)
+
+    def test_moves(self):
+        board = Board()
+        for target in ((0, 0), (0, 3), (0, 1), (0, 4)):
+            board = Move(board, target).get_result()
+
+        packed_moves = PackedMove.get_moves(board)
+        self.assertEqual(
+            [Move.from_packed(board, x) for x in packed_moves],
+            Move.get_valid_moves(board))
+
+        for packed_move in packed_moves:
+            child = board.copy()
+            child.apply(packed_move)
+            self.assertEqual(
+                child, Move.from_packed(board, packed_move).get_result())
+
 class TestPlacement(unittest.TestCase):
     def test_happy_path(self):
         board = Board()
@@ -67,6 +100,7 @@ class TestPlacement(unittest.TestCase):
         board = Move(board, (0, 3)).get_result()
         board = Move(board, (0, 1)).get_result()
         board = Move(board, (0, 4)).get_result()
+        board.get_zobrist_keys()
 
         move = Move(board, (0, 2))
 
@@ -86,6 +120,10 @@ class TestPlacement(unittest.TestCase):
         self.assertIs(board.rings[0][2], board.Player.white)
         self.assertIs(board.rings[0][3], board.Player.none)
 
+        rebuilt = board.copy()
+        rebuilt.set_masks(board.white_mask, board.black_mask)
+        self.assertEqual(board.zobrist_keys, rebuilt.get_zobrist_keys())
+
     def test_creates_mill_invalid_move(self):
         board = Board()
         board.rings[0][0] = Board.Player.white
@@ -186,6 +224,22 @@ class TestShift(unittest.TestCase):
                 self.assertIn(move, Move.get_valid_moves(self.board))
                 self.assertEqual(move.creates_mill(), result)
 
+    def test_iter_valid_moves(self):
+        self.board.next_player = self.board.Player.white
+        moves = Move.get_valid_moves(self.board)
+
+        pairs = list(Move.iter_valid_moves(self.board, with_results=True))
+        self.assertEqual([move for move, _ in pairs], moves)
+        for move, result in pairs:
+            self.assertEqual(result, move.get_result())
+
+        staged = list(Move.iter_valid_moves(self.board, staged=True))
+        self.assertCountEqual([move.to_packed() for move in staged],
+                              [move.to_packed() for move in moves])
+        mills = [move.creates_mill() for move in staged]
+        self.assertEqual(mills, sorted(mills))
+        self.assertTrue(mills[-1])
+
     def test_valid_black_shifts(self):
         instructuions = (
             # ring mill
@@ -211,6 +265,8 @@ class TestShift(unittest.TestCase):
             ((0, 2), (1, 2)),
             # shift on top
             ((0, 1), (0, 2)),
+            # jump over the middle ring
+            ((0, 1), (2, 1)),
             # source is none
             ((0, 5), (0, 6)),
             # source is none
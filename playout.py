@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import collections
+import random
+import time
+
+from board import Board
+
+# Random games are played on plain bitmasks, without Board objects, move
+# objects or Zobrist updates. A game that reaches max_plies is a draw.
+
+default_max_plies = 200
+
+_full_mask = Board.full_mask
+_adjacent_masks = Board.adjacent_masks
+_point_mills = Board.point_mills
+_placement_turns = Board.placement_turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--games', type=int, default=10000,
+        help='number of random games to play from the empty board')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed of the random number generator')
+    parser.add_argument(
+        '--max-plies', type=int, default=default_max_plies,
+        help='score games that last longer than this as draws')
+    args = parser.parse_args()
+
+    winners, plies, seconds = benchmark(
+        Board(), args.games, random.Random(args.seed), args.max_plies)
+    for player in Board.Player:
+        print(player.name, winners[player])
+    print('mean length %.1f plies' % (plies / args.games))
+    print('%.0f games/s' % (args.games / seconds))
+
+
+def benchmark(board, games, rng, max_plies=default_max_plies):
+    winners = collections.Counter()
+    plies = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        winner, length = play_out(board, rng, max_plies)
+        winners[winner] += 1
+        plies += length
+    return winners, plies, time.perf_counter() - start
+
+
+def play_out(board, rng, max_plies=default_max_plies):
+
+    # Plays uniformly random moves from the board until the game ends and
+    # returns (winner, length in plies). A move is picked by first picking
+    # its placement or shift, then the captured piece if it closes a mill.
+    # The board itself is left untouched.
+
+    random_number = rng.random
+    mover_player = board.next_player
+    opponent_player = board.last_player
+    mover_mask = board.get_mask(mover_player)
+    opponent_mask = board.get_mask(opponent_player)
+    turn_num = board.turn_num
+
+    for length in range(max_plies):
+        empty_mask = _full_mask & ~(mover_mask | opponent_mask)
+
+        if turn_num >= 0:
+            target_point = _pick_point(
+                empty_mask, int(random_number() * empty_mask.bit_count()))
+            moved_mask = mover_mask | (1 << target_point)
+            turn_num += 1
+            if turn_num >= _placement_turns:
+                turn_num = -1
+        else:
+            if mover_mask.bit_count() < Board.flying_count:
+                return opponent_player, length
+            if opponent_mask.bit_count() < Board.flying_count:
+                return mover_player, length
+
+            if mover_mask.bit_count() == Board.flying_count:
+                source_point = _pick_point(
+                    mover_mask,
+                    int(random_number() * Board.flying_count))
+                target_point = _pick_point(
+                    empty_mask,
+                    int(random_number() * empty_mask.bit_count()))
+            else:
+                shifts = []
+                remaining_mask = mover_mask
+                while remaining_mask:
+                    low_bit = remaining_mask & -remaining_mask
+                    remaining_mask ^= low_bit
+                    source_point = low_bit.bit_length() - 1
+                    target_mask = empty_mask & _adjacent_masks[source_point]
+                    while target_mask:
+                        target_bit = target_mask & -target_mask
+                        target_mask ^= target_bit
+                        shifts.append(
+                            (source_point, target_bit.bit_length() - 1))
+                if not shifts:
+                    return opponent_player, length
+                source_point, target_point = shifts[
+                    int(random_number() * len(shifts))]
+            moved_mask = mover_mask ^ (1 << source_point) | \
+                (1 << target_point)
+
+        for mill_mask in _point_mills[target_point]:
+            if moved_mask & mill_mask == mill_mask and opponent_mask:
+                opponent_mask ^= 1 << _pick_point(
+                    opponent_mask,
+                    int(random_number() * opponent_mask.bit_count()))
+                break
+
+        mover_mask, opponent_mask = opponent_mask, moved_mask
+        mover_player, opponent_player = opponent_player, mover_player
+
+    if turn_num < 0:
+        if mover_mask.bit_count() < Board.flying_count:
+            return opponent_player, max_plies
+        if opponent_mask.bit_count() < Board.flying_count:
+            return mover_player, max_plies
+    return Board.Player.none, max_plies
+
+
+def _pick_point(mask, index):
+    # Returns the point of the index-th set bit of the mask.
+    for _ in range(index):
+        mask &= mask - 1
+    return (mask & -mask).bit_length() - 1
+
+if __name__ == '__main__':
+    main()
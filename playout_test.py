@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from board import Board
+import playout
+
+class TestPlayout(unittest.TestCase):
+    def get_movement_board(self, white_points, black_points):
+        board = Board()
+        board.turn_num = -1
+        for point in white_points:
+            board.set_player(point, Board.Player.white)
+        for point in black_points:
+            board.set_player(point, Board.Player.black)
+        return board
+
+    def test_finished_game(self):
+        board = self.get_movement_board((0, 1), (8, 9, 10))
+        self.assertEqual(playout.play_out(board, random.Random(0)),
+                         (Board.Player.black, 0))
+
+    def test_blocked(self):
+        # White's pieces on ring 0 are hemmed in by black on ring 1.
+        board = self.get_movement_board(
+            (0, 2, 3, 4, 6), (1, 5, 7, 8, 10, 11, 12, 14))
+        board.set_player(9, Board.Player.black)
+        self.assertEqual(playout.play_out(board, random.Random(0)),
+                         (Board.Player.black, 0))
+
+    def test_max_plies(self):
+        self.assertEqual(
+            playout.play_out(Board(), random.Random(0), max_plies=4),
+            (Board.Player.none, 4))
+
+    def test_seeded(self):
+        board = Board()
+        games = [playout.play_out(board, random.Random(seed))
+                 for seed in range(20)]
+        self.assertEqual(
+            games,
+            [playout.play_out(board, random.Random(seed))
+             for seed in range(20)])
+        self.assertEqual(board, Board())
+        for winner, length in games:
+            if winner is not Board.Player.none:
+                self.assertGreaterEqual(length, 2 * Board.piece_count)
+
+    def test_benchmark(self):
+        winners, plies, seconds = playout.benchmark(
+            Board(), 10, random.Random(0))
+        self.assertEqual(sum(winners.values()), 10)
+        self.assertGreater(plies, 0)
+        self.assertGreater(seconds, 0)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,177 @@
+from collections import namedtuple
+
+from board import Board
+
+# Positions are grouped into classes that share piece counts, turn and
+# side to move. Within a class every position gets a dense index in
+# 0..get_class_size(position_class) - 1, built from the combinatorial
+# number system: the white pieces are ranked as a subset of all points,
+# and the black pieces as a subset of the points white leaves empty.
+
+PositionClass = namedtuple(
+    "PositionClass",
+    ("white_count", "black_count", "turn_num", "next_player"))
+
+
+def _get_binomials(size):
+    binomials = [[0] * (size + 1) for _ in range(size + 1)]
+    for n in range(size + 1):
+        binomials[n][0] = 1
+        for k in range(1, n + 1):
+            binomials[n][k] = binomials[n - 1][k - 1] + binomials[n - 1][k]
+    return binomials
+
+
+_binomials = _get_binomials(Board.num_points)
+
+
+def binomial(n, k):
+    if k < 0 or k > n:
+        return 0
+    return _binomials[n][k]
+
+
+def _get_subset_rank_tables(size):
+    # For each byte of a mask and each count of points below that byte,
+    # the part of the subset rank contributed by the points in the byte.
+    rank_tables = []
+    for shift in range(0, size, 8):
+        count_tables = []
+        for count_below in range(size + 1):
+            count_table = []
+            for byte in range(256):
+                subset_rank = 0
+                element_index = count_below + 1
+                for bit in range(min(8, size - shift)):
+                    if byte >> bit & 1:
+                        subset_rank += binomial(shift + bit, element_index)
+                        element_index += 1
+                count_table.append(subset_rank)
+            count_tables.append(tuple(count_table))
+        rank_tables.append(tuple(count_tables))
+    return tuple(rank_tables)
+
+
+def _get_compress_table():
+    # Indexed by skip_byte << 8 | byte.
+    compress_table = []
+    for skip_byte in range(256):
+        bit_images = []
+        for bit in range(8):
+            if skip_byte >> bit & 1:
+                bit_images.append(0)
+            else:
+                kept_below = bit - (skip_byte & ((1 << bit) - 1)).bit_count()
+                bit_images.append(1 << kept_below)
+
+        skip_table = [0] * 256
+        for byte in range(1, 256):
+            low_bit = byte & -byte
+            skip_table[byte] = skip_table[byte ^ low_bit] | \
+                bit_images[low_bit.bit_length() - 1]
+        compress_table.extend(skip_table)
+    return tuple(compress_table)
+
+
+_subset_rank_tables = _get_subset_rank_tables(Board.num_points)
+_compress_table = _get_compress_table()
+
+
+def get_position_class(board):
+    return PositionClass(
+        board.white_mask.bit_count(),
+        board.black_mask.bit_count(),
+        board.turn_num,
+        board.next_player)
+
+
+def get_class_size(position_class):
+    return binomial(Board.num_points, position_class.white_count) * \
+        binomial(Board.num_points - position_class.white_count,
+                 position_class.black_count)
+
+
+def rank(board):
+    position_class = get_position_class(board)
+    return position_class, rank_masks(board.white_mask, board.black_mask)
+
+
+def rank_masks(white_mask, black_mask):
+    white_count = white_mask.bit_count()
+    black_count = black_mask.bit_count()
+    free_points = Board.num_points - white_count
+
+    white_rank = _rank_subset(white_mask)
+    black_rank = _rank_subset(_compress(black_mask, white_mask))
+    return white_rank * binomial(free_points, black_count) + black_rank
+
+
+def unrank(position_class, index):
+    white_mask, black_mask = unrank_masks(
+        position_class.white_count, position_class.black_count, index)
+
+    board = Board()
+    board.set_masks(white_mask, black_mask)
+    board.turn_num = position_class.turn_num
+    board.next_player = position_class.next_player
+    return board
+
+
+def unrank_masks(white_count, black_count, index):
+    free_points = Board.num_points - white_count
+    white_rank, black_rank = divmod(
+        index, binomial(free_points, black_count))
+
+    white_mask = _unrank_subset(white_rank, white_count)
+    black_mask = _expand(_unrank_subset(black_rank, black_count), white_mask)
+    return white_mask, black_mask
+
+
+def _rank_subset(mask):
+    subset_rank = 0
+    count_below = 0
+    for count_tables in _subset_rank_tables:
+        byte = mask & 0xff
+        subset_rank += count_tables[count_below][byte]
+        count_below += byte.bit_count()
+        mask >>= 8
+    return subset_rank
+
+
+def _unrank_subset(subset_rank, count):
+    mask = 0
+    point = Board.num_points
+    for element_index in range(count, 0, -1):
+        point -= 1
+        while binomial(point, element_index) > subset_rank:
+            point -= 1
+        subset_rank -= binomial(point, element_index)
+        mask |= 1 << point
+    return mask
+
+
+def _compress(mask, skip_mask):
+    # Renumbers the points of mask as if the points of skip_mask were absent.
+    compressed_mask = 0
+    shift = 0
+    while mask:
+        skip_byte = skip_mask & 0xff
+        compressed_mask |= \
+            _compress_table[skip_byte << 8 | mask & 0xff] << shift
+        shift += 8 - skip_byte.bit_count()
+        mask >>= 8
+        skip_mask >>= 8
+    return compressed_mask
+
+
+def _expand(mask, skip_mask):
+    expanded_mask = 0
+    point = 0
+    compressed_point = 0
+    while mask >> compressed_point:
+        if not skip_mask >> point & 1:
+            if mask >> compressed_point & 1:
+                expanded_mask |= 1 << point
+            compressed_point += 1
+        point += 1
+    return expanded_mask
@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from board import Board
+import ranking
+
+class TestRanking(unittest.TestCase):
+    def test_class_is_dense(self):
+        position_class = ranking.PositionClass(2, 1, -1, Board.Player.white)
+        size = ranking.get_class_size(position_class)
+        self.assertEqual(size, 276 * 22)
+
+        seen = set()
+        for index in range(size):
+            board = ranking.unrank(position_class, index)
+            self.assertEqual(ranking.rank(board), (position_class, index))
+            seen.add(board.get_unique_id())
+        self.assertEqual(len(seen), size)
+
+    def test_round_trip(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            board = Board()
+            for point in range(Board.num_points):
+                board.set_player(point, rng.choice(list(Board.Player)))
+            board.turn_num = rng.choice((-1, 0, 7))
+            board.next_player = rng.choice(
+                (Board.Player.white, Board.Player.black))
+
+            position_class, index = ranking.rank(board)
+            with self.subTest(board=board):
+                self.assertLess(index, ranking.get_class_size(position_class))
+                self.assertEqual(ranking.unrank(position_class, index), board)
+
+    def test_extremes(self):
+        position_class = ranking.PositionClass(9, 9, -1, Board.Player.black)
+        size = ranking.get_class_size(position_class)
+        for index in (0, 1, size - 2, size - 1):
+            board = ranking.unrank(position_class, index)
+            self.assertEqual(ranking.rank(board), (position_class, index))
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
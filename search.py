@@ -0,0 +1,310 @@
+from collections import namedtuple
+import time
+
+from board import Board
+from move import PackedMove
+
+SearchResult = namedtuple(
+    "SearchResult",
+    ("move", "score", "depth", "nodes", "principal_variation"))
+
+TableEntry = namedtuple(
+    "TableEntry",
+    ("key", "depth", "score", "bound", "move", "generation"))
+
+
+class MoveOrdering:
+
+    # Orders the moves of a node: the transposition table move first, then
+    # moves that close a mill, then the killer moves of the ply, then the
+    # rest by how often they caused a cutoff anywhere in the tree.
+
+    capture_score = 1 << 40
+    killer_score = 1 << 39
+
+    def __init__(self, killer_count=2):
+        self.killer_count = killer_count
+        self.killers = []
+        self.history = [0] * (1 << (2 * PackedMove.point_bits))
+
+    def new_search(self):
+        self.killers = []
+        self.history = [score >> 1 for score in self.history]
+
+    def order(self, moves, ply, table_move=None):
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+        else:
+            killers = ()
+        history = self.history
+        history_mask = len(history) - 1
+        capture_shift = 2 * PackedMove.point_bits
+
+        def get_score(packed_move):
+            if packed_move >> capture_shift != PackedMove.none:
+                return self.capture_score
+            if packed_move in killers:
+                return self.killer_score
+            return history[packed_move & history_mask]
+
+        moves.sort(key=get_score, reverse=True)
+        if table_move is not None and table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        return moves
+
+    def record_cutoff(self, packed_move, ply, depth):
+        if packed_move >> (2 * PackedMove.point_bits) != PackedMove.none:
+            return
+
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if packed_move not in killers:
+            killers.insert(0, packed_move)
+            del killers[self.killer_count:]
+
+        self.history[packed_move & (len(self.history) - 1)] += depth * depth
+
+
+class TableMoveOrdering(MoveOrdering):
+
+    # Only puts the transposition table move first, as a baseline.
+
+    def new_search(self):
+        pass
+
+    def order(self, moves, ply, table_move=None):
+        if table_move is not None and table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        return moves
+
+    def record_cutoff(self, packed_move, ply, depth):
+        pass
+
+
+class Search:
+
+    # Negamax alpha-beta search with iterative deepening. Positions are
+    # stored in a fixed-size transposition table under their canonical
+    # Zobrist hash, so symmetric positions share an entry. The best move
+    # of an entry is kept in the orientation of the canonical image and
+    # mapped back onto the board it is read for.
+
+    win_score = 100000
+    max_ply = 1000
+    piece_score = 100
+    open_mill_score = 10
+
+    exact_bound = 0
+    lower_bound = 1
+    upper_bound = 2
+
+    def __init__(self, table_bits=18, move_ordering=None):
+        self.table = [None] * (1 << table_bits)
+        self.table_mask = len(self.table) - 1
+        self.generation = 0
+        self.move_ordering = move_ordering or MoveOrdering()
+
+        # Node and cutoff counts of the last search, to measure ordering.
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.max_nodes = None
+        self.deadline = None
+
+    def search(self, board, max_depth=64, max_nodes=None, time_limit=None):
+        self.generation += 1
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.move_ordering.new_search()
+        self.max_nodes = max_nodes
+        self.deadline = None
+        if time_limit is not None:
+            self.deadline = time.monotonic() + time_limit
+
+        board = board.copy()
+        winner = board.get_terminal_winner()
+        if winner is not Board.Player.none:
+            score = self.win_score
+            if winner is not board.next_player:
+                score = -score
+            return SearchResult(None, score, 0, 0, [])
+        moves = PackedMove.get_moves(board)
+        self.move_ordering.order(moves, 0)
+
+        result = SearchResult(
+            moves[0], self.evaluate(board), 0, 0, [moves[0]])
+        for depth in range(1, max_depth + 1):
+            try:
+                score, best_move = self._search_root(board, moves, depth)
+            except _SearchAborted:
+                break
+
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            result = SearchResult(
+                best_move, score, depth, self.nodes,
+                self.get_principal_variation(board, depth))
+            if abs(score) >= self.win_score - self.max_ply:
+                break
+
+        return result._replace(nodes=self.nodes)
+
+    def _search_root(self, board, moves, depth):
+        alpha = -self.win_score - 1
+        beta = self.win_score + 1
+        best_move = moves[0]
+
+        for packed_move in moves:
+            undo_record = board.apply(packed_move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, 1)
+            board.undo(undo_record)
+            if score > alpha:
+                alpha = score
+                best_move = packed_move
+
+        self._store(board, depth, alpha, self.exact_bound, best_move, 0)
+        return alpha, best_move
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise _SearchAborted()
+        if not self.nodes & 0x3ff:
+            self._check_deadline()
+
+        winner = board.get_terminal_winner()
+        if winner is not Board.Player.none:
+            if winner is board.next_player:
+                return self.win_score - ply
+            return ply - self.win_score
+        if depth <= 0:
+            return self.evaluate(board)
+
+        entry, table_move = self._probe(board, ply)
+        if entry is not None and entry.depth >= depth:
+            if entry.bound == self.exact_bound:
+                return entry.score
+            if entry.bound == self.lower_bound and entry.score >= beta:
+                return entry.score
+            if entry.bound == self.upper_bound and entry.score <= alpha:
+                return entry.score
+
+        moves = PackedMove.get_moves(board)
+        self.move_ordering.order(moves, ply, table_move)
+
+        original_alpha = alpha
+        best_score = -self.win_score - 1
+        best_move = moves[0]
+        for move_index, packed_move in enumerate(moves):
+            undo_record = board.apply(packed_move)
+            score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            board.undo(undo_record)
+
+            if score > best_score:
+                best_score = score
+                best_move = packed_move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.cutoffs += 1
+                if not move_index:
+                    self.first_move_cutoffs += 1
+                self.move_ordering.record_cutoff(packed_move, ply, depth)
+                break
+
+        if best_score <= original_alpha:
+            bound = self.upper_bound
+        elif best_score >= beta:
+            bound = self.lower_bound
+        else:
+            bound = self.exact_bound
+        self._store(board, depth, best_score, bound, best_move, ply)
+        return best_score
+
+    def _check_deadline(self):
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise _SearchAborted()
+
+    def _probe(self, board, ply):
+        key, symmetry = board.get_zobrist_canonical()
+        entry = self.table[key & self.table_mask]
+        if entry is None or entry.key != key:
+            return None, None
+
+        point_map = Board.symmetries[Board.inverse_symmetries[symmetry]]
+        table_move = PackedMove.permute(entry.move, point_map)
+        return entry._replace(score=self._score_from_table(
+            entry.score, ply)), table_move
+
+    def _store(self, board, depth, score, bound, packed_move, ply):
+
+        # Entries from the current search are only replaced by searches
+        # that are at least as deep, stale entries are always replaced.
+
+        key, symmetry = board.get_zobrist_canonical()
+        index = key & self.table_mask
+        entry = self.table[index]
+        if (entry is not None and entry.key != key and
+                entry.generation == self.generation and entry.depth > depth):
+            return
+
+        self.table[index] = TableEntry(
+            key, depth, self._score_to_table(score, ply), bound,
+            PackedMove.permute(packed_move, Board.symmetries[symmetry]),
+            self.generation)
+
+    def _score_to_table(self, score, ply):
+        # Win and loss scores are stored relative to the stored position.
+        if score >= self.win_score - self.max_ply:
+            return score + ply
+        if score <= self.max_ply - self.win_score:
+            return score - ply
+        return score
+
+    def _score_from_table(self, score, ply):
+        if score >= self.win_score - self.max_ply:
+            return score - ply
+        if score <= self.max_ply - self.win_score:
+            return score + ply
+        return score
+
+    def get_principal_variation(self, board, depth):
+        board = board.copy()
+        principal_variation = []
+        for _ in range(depth):
+            _, table_move = self._probe(board, 0)
+            if table_move is None or \
+                    table_move not in PackedMove.get_moves(board):
+                break
+            principal_variation.append(table_move)
+            board.apply(table_move)
+        return principal_variation
+
+    @classmethod
+    def evaluate(cls, board):
+
+        # Scores the board for the side to move by material and by mills
+        # that need a single piece to close.
+
+        player_mask = board.get_mask(board.next_player)
+        opponent_mask = board.get_mask(board.last_player)
+        empty_mask = board.get_mask(Board.Player.none)
+
+        score = cls.piece_score * (
+            player_mask.bit_count() - opponent_mask.bit_count())
+        for mill_mask in Board.mill_masks:
+            if (mill_mask & empty_mask).bit_count() != 1:
+                continue
+            if (mill_mask & player_mask).bit_count() == 2:
+                score += cls.open_mill_score
+            elif (mill_mask & opponent_mask).bit_count() == 2:
+                score -= cls.open_mill_score
+        return score
+
+
+class _SearchAborted(Exception):
+    pass
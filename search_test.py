@@ -0,0 +1,109 @@
+import unittest
+
+from board import Board
+from move import Move, PackedMove
+from search import MoveOrdering, Search, TableMoveOrdering
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        board = Board()
+        self.board = board
+        board.turn_num = -1
+
+        board.rings[0][0] = Board.Player.white
+        board.rings[0][1] = Board.Player.white
+        board.rings[0][3] = Board.Player.white
+        board.rings[1][3] = Board.Player.white
+
+        board.rings[2][4] = Board.Player.black
+        board.rings[2][5] = Board.Player.black
+        board.rings[1][7] = Board.Player.black
+
+    def test_winning_capture(self):
+        result = Search().search(self.board, max_depth=3)
+
+        target, source, mill_target = PackedMove.unpack(result.move)
+        self.assertEqual(target, Board.point_index(0, 2))
+        self.assertEqual(source, Board.point_index(0, 3))
+        self.assertIsNotNone(mill_target)
+        self.assertEqual(result.score, Search.win_score - 1)
+        self.assertEqual(result.principal_variation[0], result.move)
+        self.assertTrue(Move.from_packed(self.board, result.move).is_valid())
+
+    def test_node_budget(self):
+        search = Search()
+        result = search.search(Board(), max_depth=20, max_nodes=5000)
+
+        self.assertIn(result.move, PackedMove.get_moves(Board()))
+        self.assertLess(result.depth, 20)
+        self.assertLessEqual(result.nodes, 5000)
+
+        result = search.search(Board(), max_depth=20, max_nodes=500)
+        self.assertIn(result.move, PackedMove.get_moves(Board()))
+        self.assertLessEqual(result.nodes, 500)
+
+    def test_symmetric_table_moves(self):
+        search = Search()
+        board = self.board.get_symmetric(5)
+        search.search(self.board, max_depth=2)
+
+        # The entry stored for the original board is read back in the
+        # orientation of its symmetric image.
+        _, table_move = search._probe(board, 0)
+        self.assertIn(table_move, PackedMove.get_moves(board))
+
+    def test_blocked(self):
+        board = Board()
+        board.turn_num = -1
+        for point in (0, 2, 3, 4, 6):
+            board.set_player(point, Board.Player.white)
+        for point in (1, 5, 7, 8, 9, 10, 11, 12, 14):
+            board.set_player(point, Board.Player.black)
+
+        result = Search().search(board, max_depth=3)
+        self.assertIsNone(result.move)
+        self.assertEqual(result.score, -Search.win_score)
+
+    def test_deterministic(self):
+        first = Search().search(Board(), max_depth=3)
+        second = Search().search(Board(), max_depth=3)
+        self.assertEqual(first, second)
+
+class TestMoveOrdering(unittest.TestCase):
+    def test_order(self):
+        ordering = MoveOrdering()
+        capture = PackedMove.pack(2, 3, 20)
+        killer = PackedMove.pack(4, 5)
+        quiet = PackedMove.pack(6, 7)
+        history = PackedMove.pack(8, 9)
+        table_move = PackedMove.pack(10, 11)
+
+        ordering.record_cutoff(killer, 3, 1)
+        ordering.record_cutoff(history, 1, 4)
+        ordering.record_cutoff(capture, 3, 5)
+
+        moves = [quiet, history, killer, table_move, capture]
+        self.assertEqual(
+            ordering.order(moves, 3, table_move),
+            [table_move, capture, killer, history, quiet])
+        self.assertEqual(
+            ordering.order(moves, 2),
+            [capture, history, killer, table_move, quiet])
+        self.assertEqual(ordering.killers[3], [killer])
+
+    def test_fewer_nodes(self):
+        board = Board()
+        for target in ((0, 0), (1, 1), (0, 1), (1, 3), (2, 2), (1, 5)):
+            board = Move(board, target).get_result()
+
+        ordered = Search()
+        ordered_result = ordered.search(board, max_depth=4)
+        baseline = Search(move_ordering=TableMoveOrdering())
+        baseline_result = baseline.search(board, max_depth=4)
+
+        self.assertEqual(ordered_result.score, baseline_result.score)
+        self.assertLess(ordered.nodes, baseline.nodes)
+        self.assertGreater(ordered.first_move_cutoffs, 0)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
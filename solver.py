@@ -0,0 +1,328 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import collections
+from enum import Enum
+import time
+
+import numpy as np
+
+import batch
+from board import Board
+import ranking
+
+_point_bits = np.left_shift(
+    np.uint32(1), np.arange(Board.num_points, dtype=np.uint32))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--max-pieces', type=int, default=Board.flying_count,
+        help='solve every class where both sides have at most this many '
+        'pieces')
+    parser.add_argument(
+        '--time-budget', type=float,
+        help='give up after this many seconds')
+    parser.add_argument(
+        '--output-dir',
+        help='directory to write the solved classes to as a database')
+    parser.add_argument(
+        '--encoding', choices=('values', 'distances'), default='values',
+        help='store 2-bit values or 16-bit distances in the database')
+    args = parser.parse_args()
+
+    solver = Solver(args.max_pieces, args.time_budget)
+    finished = solver.solve()
+    for position_class, (values, _) in sorted(solver.tables.items()):
+        counts = np.bincount(values, minlength=len(Solver.Value))
+        print(position_class,
+              *('%s=%d' % (value.name, counts[value.value])
+                for value in Solver.Value))
+    if not finished:
+        print('time budget exhausted')
+
+    if args.output_dir is not None:
+        # database imports this module.
+        import database
+        database.write(args.output_dir, solver, args.encoding)
+
+
+class Solver:
+
+    # Retrograde analysis of the movement phase. Positions are stored
+    # with the side to move as white, so a class (white_count,
+    # black_count) counts the pieces of the side to move first. Moves
+    # that do not capture lead from class (w, b) to (b, w), so those two
+    # classes are solved together. Captures lead to (b - 1, w), which has
+    # one piece less in total and is solved earlier.
+    #
+    # Values and distances to the end of the game, in plies, are kept in
+    # NumPy arrays indexed by the dense rank of the position, and every
+    # step works on chunk_size ranks at a time. A group that runs out of
+    # time is kept, and the next call to solve carries on with it.
+
+    Value = Enum('Value', 'draw win loss', start=0)
+    no_distance = 0xffff
+    chunk_size = 1 << 16
+
+    # Marks a value that is pushed but not final yet.
+    _pending = 4
+
+    def __init__(self, max_pieces=Board.piece_count, time_budget=None):
+        self.max_pieces = max_pieces
+        self.time_budget = time_budget
+        self.deadline = None
+        self.tables = {}
+        self.group = None
+
+    def get_class_groups(self):
+        min_pieces = Board.flying_count
+        for total in range(2 * min_pieces, 2 * self.max_pieces + 1):
+            for mover_count in range(min_pieces, self.max_pieces + 1):
+                opponent_count = total - mover_count
+                if mover_count <= opponent_count <= self.max_pieces:
+                    yield sorted({(mover_count, opponent_count),
+                                  (opponent_count, mover_count)})
+
+    def solve(self):
+        self.deadline = None
+        if self.time_budget is not None:
+            self.deadline = time.monotonic() + self.time_budget
+
+        try:
+            for group in self.get_class_groups():
+                if group[0] not in self.tables:
+                    self.solve_group(group)
+        except _OutOfTime:
+            return False
+        return True
+
+    def get_value(self, board):
+        mover_mask = board.get_mask(board.next_player)
+        opponent_mask = board.get_mask(board.last_player)
+        return self.get_mask_value(mover_mask, opponent_mask)
+
+    def get_mask_value(self, mover_mask, opponent_mask):
+        mover_count = mover_mask.bit_count()
+        opponent_count = opponent_mask.bit_count()
+        if mover_count < Board.flying_count:
+            return Solver.Value.loss, 0
+        if opponent_count < Board.flying_count:
+            return Solver.Value.win, 0
+
+        values, distances = self.tables[(mover_count, opponent_count)]
+        index = ranking.rank_masks(mover_mask, opponent_mask)
+        value = Solver.Value(int(values[index]))
+        if value is Solver.Value.draw:
+            return value, None
+        return value, int(distances[index])
+
+    def solve_group(self, group):
+        if self.group != group:
+            self._start_group(group)
+
+        for position_class in group:
+            size = len(self._group_tables[position_class][0])
+            while self._initialized[position_class] < size:
+                self._check_time()
+                start = self._initialized[position_class]
+                end = min(start + self.chunk_size, size)
+                self._initialize(position_class, np.arange(start, end))
+                self._initialized[position_class] = end
+
+        # Every push is at least one ply further than the bucket being
+        # processed, so a bucket is complete once it is reached.
+        while self._buckets:
+            distance = min(self._buckets)
+            entries = self._buckets[distance]
+            while entries:
+                self._check_time()
+                self._finalize(distance, *entries[-1])
+                entries.pop()
+            del self._buckets[distance]
+
+        self.tables.update(self._group_tables)
+        self.group = None
+        del self._group_tables, self._counters, self._exit_distances
+        del self._initialized, self._buckets
+
+    def _start_group(self, group):
+        self.group = group
+        self._group_tables = {}
+        self._counters = {}
+        self._exit_distances = {}
+        self._initialized = {}
+        self._buckets = collections.defaultdict(list)
+
+        for position_class in group:
+            size = ranking.get_class_size(ranking.PositionClass(
+                *position_class, -1, Board.Player.white))
+            self._group_tables[position_class] = (
+                np.zeros(size, dtype=np.uint8),
+                np.full(size, self.no_distance, dtype=np.uint16))
+            self._counters[position_class] = np.zeros(size, dtype=np.uint8)
+            self._exit_distances[position_class] = np.zeros(
+                size, dtype=np.uint16)
+            self._initialized[position_class] = 0
+
+    def _check_time(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise _OutOfTime()
+
+    def _push(self, value, new_distances, position_class, indices):
+
+        # Records the value for every position that has no shorter
+        # distance yet, and queues the positions by distance.
+
+        if len(new_distances) and new_distances.max() >= self.no_distance:
+            raise OverflowError('distance %d does not fit the distance table'
+                                % new_distances.max())
+
+        values, distances = self._group_tables[position_class]
+        shorter = new_distances < distances[indices]
+        indices = indices[shorter]
+        new_distances = new_distances[shorter]
+        np.minimum.at(distances, indices, new_distances)
+        values[indices] = value.value | self._pending
+
+        for distance in np.unique(new_distances).tolist():
+            self._buckets[distance].append(
+                (value, position_class, indices[new_distances == distance]))
+
+    def _initialize(self, position_class, indices):
+        mover_count, opponent_count = position_class
+        mover_masks, opponent_masks = batch.unrank_masks(
+            mover_count, opponent_count, indices)
+        empty_masks = np.uint32(Board.full_mask) & ~(
+            mover_masks | opponent_masks)
+
+        parents, sources, targets = batch.get_shifts(
+            mover_masks, empty_masks, mover_count == Board.flying_count)
+        moved_masks = mover_masks[parents] ^ _point_bits[sources] | \
+            _point_bits[targets]
+        mill_moves = batch.closes_mill(moved_masks, targets)
+
+        count = len(indices)
+        has_move = np.bincount(parents, minlength=count) > 0
+        non_captures = np.bincount(parents[~mill_moves], minlength=count)
+
+        # Each mill takes any one piece of the opponent, which leads to
+        # the class (opponent_count - 1, mover_count).
+        mill_parents = parents[mill_moves]
+        captures, capture_points = np.nonzero(
+            (opponent_masks[mill_parents][:, None] &
+             _point_bits[None, :]) != 0)
+        child_parents = mill_parents[captures]
+        if opponent_count - 1 < Board.flying_count:
+            child_values = np.full(
+                len(captures), Solver.Value.loss.value, dtype=np.uint8)
+            child_distances = np.zeros(len(captures), dtype=np.int64)
+        else:
+            values, distances = self.tables[(opponent_count - 1,
+                                             mover_count)]
+            child_indices = batch.rank_masks(
+                opponent_masks[child_parents] ^ _point_bits[capture_points],
+                moved_masks[mill_moves][captures],
+                opponent_count - 1, mover_count)
+            child_values = values[child_indices]
+            child_distances = distances[child_indices].astype(np.int64)
+
+        win_distances = np.full(count, self.no_distance, dtype=np.int64)
+        losses = child_values == Solver.Value.loss.value
+        np.minimum.at(win_distances, child_parents[losses],
+                      child_distances[losses] + 1)
+        exit_distances = np.zeros(count, dtype=np.int64)
+        wins = child_values == Solver.Value.win.value
+        np.maximum.at(exit_distances, child_parents[wins],
+                      child_distances[wins] + 1)
+        has_draw = np.zeros(count, dtype=bool)
+        has_draw[child_parents[child_values == Solver.Value.draw.value]] = \
+            True
+
+        won = has_move & (win_distances != self.no_distance)
+        open_moves = has_move & ~won & ((non_captures > 0) | has_draw)
+        lost = has_move & ~won & ~open_moves
+
+        self._push(Solver.Value.loss, np.zeros(count - has_move.sum(),
+                                               dtype=np.int64),
+                   position_class, indices[~has_move])
+        self._push(Solver.Value.win, win_distances[won],
+                   position_class, indices[won])
+        self._push(Solver.Value.loss, exit_distances[lost],
+                   position_class, indices[lost])
+        self._counters[position_class][indices[open_moves]] = \
+            non_captures[open_moves] + has_draw[open_moves]
+        self._exit_distances[position_class][indices[open_moves]] = \
+            exit_distances[open_moves]
+
+    def _finalize(self, distance, value, position_class, indices):
+        values, distances = self._group_tables[position_class]
+        indices = np.unique(indices)
+        indices = indices[
+            (values[indices] == value.value | self._pending) &
+            (distances[indices] == distance)]
+        values[indices] = value.value
+
+        mover_count, opponent_count = position_class
+        predecessor_class = (opponent_count, mover_count)
+        predecessor_values = self._group_tables[predecessor_class][0]
+        counters = self._counters[predecessor_class]
+        exit_distances = self._exit_distances[predecessor_class]
+
+        for start in range(0, len(indices), self.chunk_size):
+            predecessors = self.get_predecessors(
+                position_class, indices[start:start + self.chunk_size])
+            predecessor_value = predecessor_values[predecessors]
+            predecessors = predecessors[
+                (predecessor_value == 0) |
+                (predecessor_value & self._pending != 0)]
+
+            if value is Solver.Value.loss:
+                self._push(Solver.Value.win,
+                           np.full(len(predecessors), distance + 1),
+                           predecessor_class, predecessors)
+                continue
+
+            predecessors, moves = np.unique(
+                predecessors[counters[predecessors] > 0],
+                return_counts=True)
+            counters[predecessors] -= moves.astype(np.uint8)
+            lost = predecessors[counters[predecessors] == 0]
+            self._push(Solver.Value.loss,
+                       np.maximum(distance + 1,
+                                  exit_distances[lost].astype(np.int64)),
+                       predecessor_class, lost)
+
+    @staticmethod
+    def get_predecessors(position_class, indices):
+
+        # Returns the ranks of the positions that reach the given ones
+        # through a move that does not close a mill. The opponent made
+        # that move, so it is the side to move in the predecessor, whose
+        # class is (opponent_count, mover_count).
+
+        mover_count, opponent_count = position_class
+        mover_masks, opponent_masks = batch.unrank_masks(
+            mover_count, opponent_count, indices)
+        empty_masks = np.uint32(Board.full_mask) & ~(
+            mover_masks | opponent_masks)
+        parents, targets, sources = batch.get_shifts(
+            opponent_masks, empty_masks,
+            opponent_count == Board.flying_count)
+        unmoved = ~batch.closes_mill(opponent_masks[parents], targets)
+        parents = parents[unmoved]
+        targets = targets[unmoved]
+        sources = sources[unmoved]
+
+        return batch.rank_masks(
+            opponent_masks[parents] ^ _point_bits[targets] |
+            _point_bits[sources],
+            mover_masks[parents], opponent_count, mover_count)
+
+
+class _OutOfTime(Exception):
+    pass
+
+if __name__ == '__main__':
+    main()
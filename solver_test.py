@@ -0,0 +1,100 @@
+import random
+import unittest
+
+from board import Board
+import ranking
+
+try:
+    import numpy
+    from solver import Solver
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestSolver(unittest.TestCase):
+    def test_class_groups(self):
+        groups = list(Solver(4).get_class_groups())
+        self.assertEqual(
+            groups,
+            [[(3, 3)], [(3, 4), (4, 3)], [(4, 4)]])
+
+    def test_terminal_values(self):
+        solver = Solver(3)
+        board = Board()
+        board.turn_num = -1
+        for ring_position in (0, 1):
+            board.rings[0][ring_position] = Board.Player.white
+        for ring_position in (0, 1, 2):
+            board.rings[1][ring_position] = Board.Player.black
+
+        self.assertEqual(solver.get_value(board), (Solver.Value.loss, 0))
+        board.next_player = Board.Player.black
+        self.assertEqual(solver.get_value(board), (Solver.Value.win, 0))
+
+    def test_predecessors(self):
+        rng = random.Random(0)
+        for position_class in ((4, 3), (3, 4), (5, 6)):
+            mover_count, opponent_count = position_class
+            size = ranking.get_class_size(ranking.PositionClass(
+                mover_count, opponent_count, -1, Board.Player.white))
+            for _ in range(20):
+                index = rng.randrange(size)
+                board = ranking.unrank(ranking.PositionClass(
+                    mover_count, opponent_count, -1, Board.Player.white),
+                    index)
+                for move_points in board.get_move_points():
+                    if move_points[2] is not None:
+                        continue
+                    child = board.copy()
+                    child.apply_points(*move_points)
+                    child_index = ranking.rank_masks(
+                        child.get_mask(child.next_player),
+                        child.get_mask(child.last_player))
+                    with self.subTest(board=board, child=child):
+                        self.assertIn(
+                            index,
+                            Solver.get_predecessors(
+                                (opponent_count, mover_count),
+                                numpy.array([child_index])).tolist())
+
+    def test_time_budget(self):
+        solver = Solver(3, time_budget=0)
+        self.assertFalse(solver.solve())
+        self.assertEqual(solver.tables, {})
+
+    def test_solved_values(self):
+        # Solved in short slices, each carrying on where the last stopped.
+        solver = Solver(3, time_budget=1)
+        slices = 1
+        while not solver.solve():
+            slices += 1
+        self.assertGreater(slices, 1)
+
+        rng = random.Random(0)
+        position_class = ranking.PositionClass(3, 3, -1, Board.Player.white)
+        size = ranking.get_class_size(position_class)
+        for index in rng.sample(range(size), 500):
+            board = ranking.unrank(position_class, index)
+            child_results = []
+            for move_points in board.get_move_points():
+                child = board.copy()
+                child.apply_points(*move_points)
+                child_results.append(solver.get_value(child))
+            loss_distances = [distance for value, distance in child_results
+                              if value is Solver.Value.loss]
+
+            if not child_results:
+                expected = Solver.Value.loss, 0
+            elif loss_distances:
+                expected = Solver.Value.win, min(loss_distances) + 1
+            elif any(value is Solver.Value.draw
+                     for value, _ in child_results):
+                expected = Solver.Value.draw, None
+            else:
+                expected = Solver.Value.loss, max(
+                    distance for _, distance in child_results) + 1
+            with self.subTest(board=board):
+                self.assertEqual(solver.get_value(board), expected)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
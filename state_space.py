@@ -0,0 +1,496 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import array
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+import time
+
+from board import Board
+import visited
+
+# A checkpoint holds the state of a run partway through a layer: a
+# header with the position reached in the frontier, then the layer
+# counts, the frontier, the visited movement keys and the keys and ids
+# of the children found so far, each as an array of uint64.
+_checkpoint_header = struct.Struct('<4sBBBBQQQQQ')
+_checkpoint_magic = b'NMMC'
+_checkpoint_version = 2
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--symmetry', choices=[x.name for x in Board.SymmetryGroup],
+        default=Board.symmetry_group.name,
+        help='symmetry group used to merge equivalent boards')
+    parser.add_argument(
+        '--zobrist', action='store_true',
+        help='track visited boards by 64-bit Zobrist hash instead of '
+        'exact universal id')
+    parser.add_argument(
+        '--output-dir',
+        help='directory to spill finished layers to')
+    parser.add_argument(
+        '--max-depth', type=int,
+        help='stop after this many plies')
+    parser.add_argument(
+        '--processes', type=int, default=1,
+        help='number of worker processes used to expand each layer')
+    parser.add_argument(
+        '--batch-size', type=int,
+        help='expand boards with NumPy array operations, this many at a '
+        'time')
+    parser.add_argument(
+        '--visited', choices=visited.backends, default='set',
+        help='data structure that holds the visited movement boards')
+    parser.add_argument(
+        '--checkpoint',
+        help='file to save the state of the run to, between chunks of '
+        'the frontier')
+    parser.add_argument(
+        '--checkpoint-interval', type=float, default=600,
+        help='seconds between checkpoints')
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='continue from the checkpoint file if there is one')
+    parser.add_argument(
+        '--instrument', action='store_true',
+        help='print call counts and times of the hot paths on exit')
+    parser.add_argument(
+        '--profile',
+        help='write a cProfile dump in pstats format to this file')
+    args = parser.parse_args()
+    if args.batch_size is not None and args.zobrist:
+        parser.error('--batch-size does not support --zobrist')
+    if args.visited == 'bitset' and args.zobrist:
+        parser.error('--visited bitset does not support --zobrist')
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume needs --checkpoint')
+
+    logging.basicConfig(
+        filename=sys.argv[0] + ".txt",
+        format='%(levelname)s:%(message)s',
+        level=logging.DEBUG,
+        filemode='w')
+
+    enumeration = Enumeration(
+        output_dir=args.output_dir,
+        symmetry_group=Board.SymmetryGroup[args.symmetry],
+        use_zobrist=args.zobrist,
+        processes=args.processes,
+        batch_size=args.batch_size,
+        visited_backend=args.visited,
+        checkpoint_path=args.checkpoint,
+        checkpoint_interval=args.checkpoint_interval)
+
+    if args.instrument or args.profile is not None:
+        import instrument
+        with instrument.session(args.instrument, args.profile,
+                                [(Enumeration, 'add_child')]):
+            enumeration.run(args.max_depth, args.resume)
+    else:
+        enumeration.run(args.max_depth, args.resume)
+
+    for depth, count in enumerate(enumeration.layer_counts):
+        print(depth, count)
+    print('total', sum(enumeration.layer_counts))
+
+
+class Enumeration:
+
+    # Breadth-first walk of every board reachable from the empty board,
+    # merging boards that are equivalent under the symmetry group.
+    # Boards are held as the unique ID of their canonical image, which
+    # packs the whole board into 64 bits.
+    #
+    # Only the current and next layers are kept in memory. Placing boards
+    # can never repeat across layers, since every placement advances the
+    # turn number, so only movement phase boards stay in the visited set.
+    #
+    # The frontier is expanded chunk_size boards at a time into
+    # child_layer, and the visited boards are only dropped once the whole
+    # frontier is expanded. With several processes, worker k owns shard k
+    # of the visited set and of child_layer for the whole run, and both
+    # stay empty in the parent.
+    #
+    # With a checkpoint path, the run is saved between chunks and after
+    # finished layers once checkpoint_interval seconds have passed since
+    # the last save, and run can resume from there.
+
+    layer_type = 'Q'
+    chunk_size = 1 << 16
+
+    def __init__(self, output_dir=None, symmetry_group=None,
+                 use_zobrist=False, processes=1, batch_size=None,
+                 visited_backend='set', checkpoint_path=None,
+                 checkpoint_interval=0):
+        self.output_dir = output_dir
+        self.symmetry_group = symmetry_group or Board.symmetry_group
+        self.use_zobrist = use_zobrist
+        self.processes = processes
+        self.batch_size = batch_size
+        self.visited_backend = visited_backend
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint = time.monotonic()
+
+        self.layer_counts = []
+        self.movement_keys = visited.create(visited_backend)
+        self.child_layer = {}
+        self.shard_pools = None
+
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def get_key(self, board, board_id):
+        if self.use_zobrist:
+            return board.get_zobrist_hash(self.symmetry_group)
+        return board_id
+
+    def run(self, max_depth=None, resume=False):
+        position = 0
+        if (resume and self.checkpoint_path is not None and
+                os.path.exists(self.checkpoint_path)):
+            frontier, position = self.read_checkpoint()
+            logging.info('resumed at board %d of layer %d', position,
+                         len(self.layer_counts) - 1)
+        else:
+            root_id = Board().get_universal_id(self.symmetry_group)
+            frontier = array.array(self.layer_type, [root_id])
+            self.finish_layer(frontier)
+
+        try:
+            if self.processes > 1:
+                self.start_shards()
+            while frontier:
+                if (max_depth is not None and
+                        len(self.layer_counts) > max_depth):
+                    break
+                frontier = self.expand(frontier, position)
+                position = 0
+                if frontier:
+                    self.finish_layer(frontier)
+                    if self.is_checkpoint_due():
+                        self.write_checkpoint(frontier)
+        finally:
+            if self.shard_pools is not None:
+                for pool in self.shard_pools:
+                    pool.terminate()
+                self.shard_pools = None
+
+        return self.layer_counts
+
+    def is_checkpoint_due(self):
+        return (self.checkpoint_path is not None and
+                time.monotonic() - self.last_checkpoint >=
+                self.checkpoint_interval)
+
+    def expand(self, frontier, position=0):
+
+        # Expands the frontier from the given position on, and returns
+        # the sorted ids of the children not visited before.
+
+        chunk_size = max(self.chunk_size, self.batch_size or 0)
+        while position < len(frontier):
+            self.add_children(frontier[position:position + chunk_size])
+            position = min(position + chunk_size, len(frontier))
+            if position < len(frontier) and self.is_checkpoint_due():
+                self.write_checkpoint(frontier, position)
+        return self.finish_children()
+
+    def add_children(self, board_ids):
+        if self.shard_pools is None:
+            self.get_child_layer(board_ids, self.child_layer)
+            return
+
+        # Worker k expands part k of the boards and splits the children
+        # by the shard of their key, then merges shard k of every
+        # worker's children into its own child layer.
+        expansions = [
+            pool.apply_async(_expand_shard, (part,))
+            for pool, part in zip(self.shard_pools,
+                                  self.split_shards(board_ids))]
+        results = [expansion.get() for expansion in expansions]
+        merges = [
+            pool.apply_async(
+                _add_shard_children, ([result[shard] for result in results],))
+            for shard, pool in enumerate(self.shard_pools)]
+        for merge in merges:
+            merge.get()
+
+    def finish_children(self):
+
+        # Drops the visited children, marks the rest visited and returns
+        # their sorted ids. Shard workers filter their own children, so
+        # the parent only gathers the survivors.
+
+        if self.shard_pools is not None:
+            finishes = [pool.apply_async(_finish_shard)
+                        for pool in self.shard_pools]
+            next_layer = array.array(self.layer_type)
+            for finish in finishes:
+                next_layer.extend(finish.get())
+            return array.array(self.layer_type, sorted(next_layer))
+
+        child_layer = self.child_layer
+        self.child_layer = {}
+        for key, child_id in list(child_layer.items()):
+            if not self.is_placing_id(child_id):
+                if key in self.movement_keys:
+                    del child_layer[key]
+                else:
+                    self.movement_keys.add(key)
+        return array.array(self.layer_type, sorted(child_layer.values()))
+
+    def get_child_layer(self, board_ids, child_layer=None):
+        if child_layer is None:
+            child_layer = {}
+        if self.batch_size is not None:
+            for child_id in self.get_child_ids_batched(board_ids):
+                child_layer[child_id] = child_id
+            return child_layer
+
+        for board_id in board_ids:
+            for key, child_id in self.get_children(board_id):
+                self.add_child(child_layer, key, child_id)
+        return child_layer
+
+    def get_child_ids_batched(self, board_ids):
+        # NumPy is only needed for batched expansion.
+        import batch
+        import numpy
+
+        child_ids = batch.get_child_ids(
+            numpy.asarray(board_ids, dtype=numpy.uint64),
+            self.symmetry_group, self.batch_size)
+        return child_ids.tolist()
+
+    def start_shards(self):
+
+        # A pool of one process per shard, so that every task for shard k
+        # runs in the worker that holds its visited keys and children.
+        # Those restored from a checkpoint are handed to their owners.
+
+        key_parts = self.split_shards(self.movement_keys)
+        child_parts = self.split_children(*self.get_partial_children())
+
+        settings = (self.symmetry_group.name, self.use_zobrist,
+                    self.processes, self.batch_size, self.visited_backend)
+        self.shard_pools = [
+            multiprocessing.Pool(1, _start_shard, (settings,))
+            for _ in range(self.processes)]
+        for pool, keys, children in zip(
+                self.shard_pools, key_parts, child_parts):
+            pool.apply(_add_shard_keys, (keys,))
+            pool.apply(_add_shard_children, ([children],))
+        self.movement_keys = visited.create(self.visited_backend)
+        self.child_layer = {}
+
+    def split_shards(self, keys):
+        parts = [array.array(self.layer_type) for _ in range(self.processes)]
+        for key in keys:
+            parts[get_shard(key, len(parts))].append(key)
+        return parts
+
+    def split_children(self, keys, child_ids):
+
+        # Splits the children by the shard of their key, as a (keys,
+        # child ids) pair of arrays per shard.
+
+        shard_count = self.processes
+        parts = [(array.array(self.layer_type), array.array(self.layer_type))
+                 for _ in range(shard_count)]
+        for key, child_id in zip(keys, child_ids):
+            part_keys, part_child_ids = parts[get_shard(key, shard_count)]
+            part_keys.append(key)
+            part_child_ids.append(child_id)
+        return parts
+
+    def get_movement_keys(self):
+        if self.shard_pools is None:
+            return array.array(self.layer_type, self.movement_keys)
+
+        movement_keys = array.array(self.layer_type)
+        for pool in self.shard_pools:
+            movement_keys.extend(pool.apply(_get_shard_keys))
+        return movement_keys
+
+    def get_partial_children(self):
+        # The keys and ids of the children found so far in this layer.
+        keys = array.array(self.layer_type)
+        child_ids = array.array(self.layer_type)
+        if self.shard_pools is None:
+            keys.extend(self.child_layer.keys())
+            child_ids.extend(self.child_layer.values())
+            return keys, child_ids
+
+        for pool in self.shard_pools:
+            shard_keys, shard_child_ids = pool.apply(_get_shard_children)
+            keys.extend(shard_keys)
+            child_ids.extend(shard_child_ids)
+        return keys, child_ids
+
+    @staticmethod
+    def add_child(child_layer, key, child_id):
+        # Keeping the smallest id makes hash collisions deterministic.
+        if key not in child_layer or child_id < child_layer[key]:
+            child_layer[key] = child_id
+
+    def get_children(self, board_id):
+        board = Board.from_unique_id(board_id)
+        if board.get_winner() is not Board.Player.none:
+            return
+
+        # Hash the parent once, so each child only toggles the keys of the
+        # points its move changes.
+
+        if self.use_zobrist:
+            board.get_zobrist_keys()
+        for move_points in board.get_move_points():
+            undo_record = board.apply_points(*move_points)
+            child_id = board.get_universal_id(self.symmetry_group)
+            yield self.get_key(board, child_id), child_id
+            board.undo(undo_record)
+
+    @staticmethod
+    def is_placing_id(board_id):
+        return board_id >> (2 * Board.num_points) >= len(Board.Player)
+
+    def finish_layer(self, layer):
+        depth = len(self.layer_counts)
+        self.layer_counts.append(len(layer))
+        logging.info('layer %d: %d boards', depth, len(layer))
+
+        if self.output_dir is not None:
+            with open(self.get_layer_path(depth), 'wb') as layer_file:
+                layer.tofile(layer_file)
+
+    def write_checkpoint(self, frontier, position=0):
+
+        # Saves the run with the frontier expanded up to the position.
+        # Written to a temporary file first, so an interrupted write
+        # leaves the previous checkpoint in place.
+
+        layer_counts = array.array(self.layer_type, self.layer_counts)
+        movement_keys = self.get_movement_keys()
+        child_keys, child_ids = self.get_partial_children()
+        temporary_path = self.checkpoint_path + '.tmp'
+        with open(temporary_path, 'wb') as checkpoint_file:
+            checkpoint_file.write(_checkpoint_header.pack(
+                _checkpoint_magic, _checkpoint_version,
+                self.symmetry_group.value, self.use_zobrist,
+                visited.backends.index(self.visited_backend),
+                len(layer_counts), len(frontier), len(movement_keys),
+                position, len(child_ids)))
+            for values in (layer_counts, frontier, movement_keys,
+                           child_keys, child_ids):
+                values.tofile(checkpoint_file)
+        os.replace(temporary_path, self.checkpoint_path)
+
+        self.last_checkpoint = time.monotonic()
+        logging.info('checkpoint at board %d of layer %d', position,
+                     len(self.layer_counts) - 1)
+
+    def read_checkpoint(self):
+
+        # Restores the layer counts, the visited set and the children
+        # found so far, and returns the frontier and the position its
+        # expansion continues from. The checkpoint must come from the
+        # same settings.
+
+        with open(self.checkpoint_path, 'rb') as checkpoint_file:
+            (magic, version, symmetry, use_zobrist, backend, count_length,
+             frontier_length, keys_length, position,
+             children_length) = _checkpoint_header.unpack(
+                checkpoint_file.read(_checkpoint_header.size))
+            if magic != _checkpoint_magic or version != _checkpoint_version:
+                raise ValueError('%s is not a version %d checkpoint' %
+                                 (self.checkpoint_path, _checkpoint_version))
+            if (symmetry != self.symmetry_group.value or
+                    use_zobrist != self.use_zobrist or
+                    visited.backends[backend] != self.visited_backend):
+                raise ValueError('%s was written with other settings' %
+                                 self.checkpoint_path)
+
+            arrays = []
+            for length in (count_length, frontier_length, keys_length,
+                           children_length, children_length):
+                values = array.array(self.layer_type)
+                values.fromfile(checkpoint_file, length)
+                arrays.append(values)
+
+        layer_counts, frontier, movement_keys, child_keys, child_ids = arrays
+        self.layer_counts = list(layer_counts)
+        self.movement_keys = visited.create(self.visited_backend)
+        for key in movement_keys:
+            self.movement_keys.add(key)
+        self.child_layer = dict(zip(child_keys, child_ids))
+        return frontier, position
+
+    def get_layer_path(self, depth):
+        return os.path.join(self.output_dir, 'layer_%04d.bin' % depth)
+
+    def read_layer(self, depth):
+        layer = array.array(self.layer_type)
+        with open(self.get_layer_path(depth), 'rb') as layer_file:
+            layer.frombytes(layer_file.read())
+        return layer
+
+
+def get_shard(key, shard_count):
+    return ((key * 0x9e3779b97f4a7c15) >> 32) % shard_count
+
+
+# The enumeration of a shard worker, holding the visited keys and the
+# children found so far of its shard.
+_shard_enumeration = None
+
+
+def _start_shard(settings):
+    global _shard_enumeration
+    (symmetry_name, use_zobrist, shard_count, batch_size,
+     visited_backend) = settings
+    _shard_enumeration = Enumeration(
+        symmetry_group=Board.SymmetryGroup[symmetry_name],
+        use_zobrist=use_zobrist,
+        processes=shard_count,
+        batch_size=batch_size,
+        visited_backend=visited_backend)
+
+
+def _add_shard_keys(keys):
+    for key in keys:
+        _shard_enumeration.movement_keys.add(key)
+
+
+def _get_shard_keys():
+    return _shard_enumeration.get_movement_keys()
+
+
+def _expand_shard(board_ids):
+    # Deduplicated within this part of the frontier only.
+    child_layer = _shard_enumeration.get_child_layer(board_ids)
+    return _shard_enumeration.split_children(
+        child_layer.keys(), child_layer.values())
+
+
+def _add_shard_children(pieces):
+    child_layer = _shard_enumeration.child_layer
+    for keys, child_ids in pieces:
+        for key, child_id in zip(keys, child_ids):
+            Enumeration.add_child(child_layer, key, child_id)
+
+
+def _get_shard_children():
+    return _shard_enumeration.get_partial_children()
+
+
+def _finish_shard():
+    return _shard_enumeration.finish_children()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+import array
+import os
+import tempfile
+import unittest
+
+from board import Board
+import state_space
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestEnumeration(unittest.TestCase):
+    def walk(self, depth):
+        layer = [Board()]
+        counts = [len(layer)]
+        for _ in range(depth):
+            next_layer = {}
+            for board in layer:
+                for child in board.get_child_boards():
+                    next_layer.setdefault(child.get_universal_id(), child)
+            layer = list(next_layer.values())
+            counts.append(len(layer))
+        return counts
+
+    def test_counts(self):
+        enumeration = state_space.Enumeration()
+        self.assertEqual(enumeration.run(3), self.walk(3))
+
+    def test_zobrist(self):
+        self.assertEqual(
+            state_space.Enumeration(use_zobrist=True).run(3),
+            state_space.Enumeration().run(3))
+
+    def test_zobrist_incremental(self):
+        hashed = []
+
+        class CheckedEnumeration(state_space.Enumeration):
+            def get_key(self, board, board_id):
+                hashed.append(board.zobrist_keys is not None)
+                return super().get_key(board, board_id)
+
+        CheckedEnumeration(use_zobrist=True).run(3)
+        self.assertTrue(hashed)
+        self.assertTrue(all(hashed))
+
+    def test_symmetry_group(self):
+        full = state_space.Enumeration(
+            symmetry_group=Board.SymmetryGroup.full).run(2)
+        square = state_space.Enumeration(
+            symmetry_group=Board.SymmetryGroup.square).run(2)
+        self.assertEqual(full, [1, 4, 46])
+        self.assertEqual(square, [1, 6, 84])
+
+    def test_parallel(self):
+        with tempfile.TemporaryDirectory() as serial_dir, \
+                tempfile.TemporaryDirectory() as parallel_dir:
+            serial = state_space.Enumeration(output_dir=serial_dir)
+            parallel = state_space.Enumeration(
+                output_dir=parallel_dir, processes=2)
+
+            counts = serial.run(3)
+            self.assertEqual(parallel.run(3), counts)
+            for depth in range(len(counts)):
+                self.assertEqual(parallel.read_layer(depth),
+                                 serial.read_layer(depth))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_batch(self):
+        with tempfile.TemporaryDirectory() as serial_dir, \
+                tempfile.TemporaryDirectory() as batch_dir:
+            serial = state_space.Enumeration(output_dir=serial_dir)
+            batched = state_space.Enumeration(
+                output_dir=batch_dir, batch_size=16)
+
+            counts = serial.run(4)
+            self.assertEqual(batched.run(4), counts)
+            for depth in range(len(counts)):
+                self.assertEqual(batched.read_layer(depth),
+                                 serial.read_layer(depth))
+
+    def test_visited_backends(self):
+        board = Board()
+        board.turn_num = -1
+        for point in (0, 1, 9, 12):
+            board.set_player(point, Board.Player.white)
+        for point in (2, 8, 17, 20):
+            board.set_player(point, Board.Player.black)
+        frontier = [board.get_universal_id()]
+
+        expected = None
+        for backend in ('set', 'hash', 'bitset'):
+            with self.subTest(backend=backend):
+                enumeration = state_space.Enumeration(
+                    visited_backend=backend)
+                children = enumeration.expand(frontier)
+                if expected is None:
+                    expected = children
+                self.assertEqual(children, expected)
+                self.assertEqual(len(enumeration.movement_keys),
+                                 len(children))
+                self.assertEqual(len(enumeration.expand(frontier)), 0)
+
+    def test_sharded_visited(self):
+        board = Board()
+        board.turn_num = -1
+        for point in (0, 1, 9, 12):
+            board.set_player(point, Board.Player.white)
+        for point in (2, 8, 17, 20):
+            board.set_player(point, Board.Player.black)
+        frontier = [board.get_universal_id()]
+        expected = state_space.Enumeration().expand(frontier)
+
+        enumeration = state_space.Enumeration(processes=2)
+        enumeration.movement_keys.add(expected[0])
+        enumeration.start_shards()
+        try:
+            self.assertEqual(enumeration.expand(frontier), expected[1:])
+            self.assertEqual(len(enumeration.movement_keys), 0)
+            self.assertEqual(sorted(enumeration.get_movement_keys()),
+                             list(expected))
+            self.assertEqual(len(enumeration.expand(frontier)), 0)
+        finally:
+            for pool in enumeration.shard_pools:
+                pool.terminate()
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint')
+            interrupted = state_space.Enumeration(checkpoint_path=path)
+            interrupted.run(2)
+
+            resumed = state_space.Enumeration(checkpoint_path=path)
+            self.assertEqual(resumed.run(4, resume=True),
+                             state_space.Enumeration().run(4))
+
+            fresh = state_space.Enumeration(checkpoint_path=path)
+            self.assertEqual(len(fresh.run(1)), 2)
+
+    def test_resume_mid_layer(self):
+        class Interrupted(Exception):
+            pass
+
+        class InterruptedEnumeration(state_space.Enumeration):
+            # Stops in the second chunk of the fourth layer.
+            chunk_size = 10
+            chunks = 0
+
+            def add_children(self, board_ids):
+                if len(self.layer_counts) == 4:
+                    self.chunks += 1
+                    if self.chunks == 2:
+                        raise Interrupted()
+                super().add_children(board_ids)
+
+        expected = state_space.Enumeration().run(4)
+        for processes in (1, 2):
+            with self.subTest(processes=processes), \
+                    tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'checkpoint')
+                interrupted = InterruptedEnumeration(
+                    checkpoint_path=path, processes=processes)
+                with self.assertRaises(Interrupted):
+                    interrupted.run(4)
+
+                frontier, position = state_space.Enumeration(
+                    checkpoint_path=path).read_checkpoint()
+                self.assertEqual(len(frontier), expected[3])
+                self.assertEqual(position, 10)
+
+                resumed = state_space.Enumeration(
+                    checkpoint_path=path, processes=processes)
+                self.assertEqual(resumed.run(4, resume=True), expected)
+
+    def test_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint')
+            frontier = array.array('Q', [5, 7, 11])
+            for backend in ('set', 'hash'):
+                with self.subTest(backend=backend):
+                    enumeration = state_space.Enumeration(
+                        visited_backend=backend, checkpoint_path=path)
+                    enumeration.layer_counts = [1, 4, 46]
+                    for key in (3, 1 << 63, 12345):
+                        enumeration.movement_keys.add(key)
+                    enumeration.child_layer = {13: 17, 19: 19}
+                    enumeration.write_checkpoint(frontier, 2)
+
+                    restored = state_space.Enumeration(
+                        visited_backend=backend, checkpoint_path=path)
+                    self.assertEqual(restored.read_checkpoint(),
+                                     (frontier, 2))
+                    self.assertEqual(restored.layer_counts, [1, 4, 46])
+                    self.assertEqual(set(restored.movement_keys),
+                                     {3, 1 << 63, 12345})
+                    self.assertEqual(restored.child_layer, {13: 17, 19: 19})
+
+            other = state_space.Enumeration(
+                use_zobrist=True, visited_backend='hash',
+                checkpoint_path=path)
+            with self.assertRaises(ValueError):
+                other.read_checkpoint()
+
+    def test_spill(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            enumeration = state_space.Enumeration(output_dir=output_dir)
+            counts = enumeration.run(2)
+
+            for depth, count in enumerate(counts):
+                layer = enumeration.read_layer(depth)
+                self.assertEqual(len(layer), count)
+                self.assertEqual(list(layer), sorted(layer))
+                for board_id in layer:
+                    board = Board.from_unique_id(board_id)
+                    self.assertEqual(board.turn_num, depth)
+                    self.assertEqual(board.get_unique_id(), board_id)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
@@ -0,0 +1,280 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import argparse
+import collections
+import math
+import multiprocessing
+import os
+import random
+import struct
+
+from board import Board
+from mcts import MCTS
+from move import PackedMove
+from search import Search
+
+# A results file starts with a header naming the two engines, as the
+# length of their specifications followed by the specifications joined by
+# a newline. Results are appended after it as fixed-size records, one per
+# game: game number, opening seed, index of the white and black engine in
+# the header, Board.Player value of the winner and length in plies.
+
+_header = struct.Struct('<4sH')
+_magic = b'NMMT'
+_record = struct.Struct('<IIBBBH')
+
+GameResult = collections.namedtuple(
+    "GameResult", ("game", "seed", "white", "black", "winner", "plies"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        'engines', nargs=2,
+        help='engine specifications such as random, search:depth=3, '
+        'search:nodes=5000 or mcts:playouts=200')
+    parser.add_argument(
+        '--games', type=int, default=100,
+        help='number of games to play, in pairs with the colours swapped')
+    parser.add_argument(
+        '--processes', type=int, default=1,
+        help='number of worker processes playing games')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed of the first opening')
+    parser.add_argument(
+        '--opening-plies', type=int, default=4,
+        help='number of random moves played before the engines take over')
+    parser.add_argument(
+        '--max-plies', type=int, default=200,
+        help='score games that last longer than this as draws')
+    parser.add_argument(
+        '--results', default='tournament.results',
+        help='file the results are appended to')
+    parser.add_argument(
+        '--report-every', type=int, default=10,
+        help='print the standings after this many games')
+    args = parser.parse_args()
+
+    for spec in args.engines:
+        Engine(spec)
+
+    engines = read_engines(args.results)
+    if engines is None:
+        with open(args.results, 'wb') as results_file:
+            write_header(results_file, args.engines)
+    elif engines != args.engines:
+        parser.error('%s holds games between %s and %s' %
+                     (args.results, *engines))
+
+    truncate_results(args.results)
+    previous_results = read_results(args.results)
+    first_game = len(previous_results)
+    tasks = [
+        (args.engines, game, args.seed + game // 2, args.opening_plies,
+         args.max_plies)
+        for game in range(first_game, first_game + args.games)]
+
+    scores = get_scores(previous_results)
+    pool = None
+    if args.processes > 1:
+        pool = multiprocessing.Pool(args.processes)
+        results = pool.imap_unordered(_play_task, tasks)
+    else:
+        results = map(_play_task, tasks)
+
+    try:
+        with open(args.results, 'ab') as results_file:
+            for count, result in enumerate(results, 1):
+                write_result(results_file, result)
+                scores[get_outcome(result)] += 1
+                if count % args.report_every == 0 or count == len(tasks):
+                    results_file.flush()
+                    print(first_game + count, format_standings(*scores))
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+class Engine:
+
+    # Picks moves for one side of a game. A specification is a kind
+    # followed by options, as in "search:depth=3,table_bits=16".
+
+    kinds = ('random', 'search', 'mcts')
+
+    def __init__(self, spec):
+        self.spec = spec
+        kind, _, options = spec.partition(':')
+        if kind not in self.kinds:
+            raise ValueError('unknown engine %r' % kind)
+        self.kind = kind
+
+        self.options = {}
+        for option in filter(None, options.split(',')):
+            name, _, value = option.partition('=')
+            self.options[name] = float(value) if '.' in value else int(value)
+
+    def select_move(self, board, rng):
+        if self.kind == 'random':
+            return rng.choice(PackedMove.get_moves(board))
+
+        if self.kind == 'search':
+            search = Search(self.options.get('table_bits', 16))
+            return search.search(
+                board,
+                max_depth=self.options.get('depth', 64),
+                max_nodes=self.options.get('nodes'),
+                time_limit=self.options.get('time')).move
+
+        mcts = MCTS(
+            playouts=self.options.get('playouts', 1000),
+            time_limit=self.options.get('time'),
+            seed=rng.randrange(1 << 32))
+        return mcts.search(board).move
+
+
+def play_game(white, black, seed, opening_plies=4, max_plies=200):
+
+    # Plays one game after a random opening drawn from the seed, and
+    # returns (winner, plies). The side to move loses when it has no
+    # moves, and a game still running after max_plies is a draw.
+
+    rng = random.Random(seed)
+    board = Board()
+    engines = {Board.Player.white: white, Board.Player.black: black}
+
+    for plies in range(max_plies):
+        winner = board.get_terminal_winner()
+        if winner is not Board.Player.none:
+            return winner, plies
+
+        if plies < opening_plies:
+            packed_move = rng.choice(PackedMove.get_moves(board))
+        else:
+            packed_move = engines[board.next_player].select_move(board, rng)
+        board.apply(packed_move)
+
+    return board.get_terminal_winner(), max_plies
+
+
+def _play_task(task):
+    specs, game, seed, opening_plies, max_plies = task
+
+    # Colours alternate, so both engines play each opening with each side.
+    white = game % 2
+    black = 1 - white
+    winner, plies = play_game(
+        Engine(specs[white]), Engine(specs[black]), seed, opening_plies,
+        max_plies)
+    return GameResult(game, seed, white, black, winner.value, plies)
+
+
+def write_header(results_file, engines):
+    specs = '\n'.join(engines).encode()
+    results_file.write(_header.pack(_magic, len(specs)) + specs)
+
+
+def write_result(results_file, result):
+    results_file.write(_record.pack(*result))
+
+
+def _read_header(results_file):
+
+    # Returns the engine specifications and leaves the file at the first
+    # record, or returns None for an empty file.
+
+    header = results_file.read(_header.size)
+    if not header:
+        return None
+    if len(header) < _header.size:
+        raise ValueError('%s is not a results file' % results_file.name)
+    magic, specs_length = _header.unpack(header)
+    specs = results_file.read(specs_length)
+    if magic != _magic or len(specs) < specs_length:
+        raise ValueError('%s is not a results file' % results_file.name)
+    return specs.decode().split('\n')
+
+
+def read_engines(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as results_file:
+        return _read_header(results_file)
+
+
+def truncate_results(path):
+
+    # Drops a partial record left by an interrupted write, so records
+    # appended after it stay aligned.
+
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as results_file:
+        if _read_header(results_file) is None:
+            return
+        offset = results_file.tell()
+    size = os.path.getsize(path)
+    if (size - offset) % _record.size:
+        os.truncate(path, size - (size - offset) % _record.size)
+
+
+def read_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as results_file:
+        if _read_header(results_file) is None:
+            return []
+        data = results_file.read()
+    data = data[:len(data) - len(data) % _record.size]
+    return [GameResult(*fields) for fields in _record.iter_unpack(data)]
+
+
+def get_outcome(result):
+    # 0 for a win of the first engine, 1 for a draw and 2 for a loss.
+    if result.winner == Board.Player.none.value:
+        return 1
+    winner_index = result.white
+    if result.winner == Board.Player.black.value:
+        winner_index = result.black
+    return 2 * winner_index
+
+
+def get_scores(results):
+    scores = [0, 0, 0]
+    for result in results:
+        scores[get_outcome(result)] += 1
+    return scores
+
+
+def get_score_interval(wins, draws, losses, z=1.96):
+
+    # Returns the mean score of the first engine and the bounds of its
+    # normal approximation confidence interval.
+
+    games = wins + draws + losses
+    if not games:
+        return 0.5, 0.0, 1.0
+    score = (wins + 0.5 * draws) / games
+    variance = (wins + 0.25 * draws) / games - score * score
+    margin = z * math.sqrt(max(variance, 0.0) / games)
+    return score, max(score - margin, 0.0), min(score + margin, 1.0)
+
+
+def get_elo(score):
+    if score <= 0.0:
+        return -math.inf
+    if score >= 1.0:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+
+def format_standings(wins, draws, losses):
+    score, low, high = get_score_interval(wins, draws, losses)
+    return '+%d =%d -%d score %.3f [%.3f, %.3f] elo %+.0f [%+.0f, %+.0f]' % (
+        wins, draws, losses, score, low, high,
+        get_elo(score), get_elo(low), get_elo(high))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import math
+import os
+import tempfile
+import unittest
+
+from board import Board
+import tournament
+
+class TestTournament(unittest.TestCase):
+    def test_engine_spec(self):
+        engine = tournament.Engine('search:depth=2,time=0.5')
+        self.assertEqual(engine.kind, 'search')
+        self.assertEqual(engine.options, {'depth': 2, 'time': 0.5})
+        self.assertEqual(tournament.Engine('random').options, {})
+        with self.assertRaises(ValueError):
+            tournament.Engine('oracle')
+
+    def test_play_game(self):
+        random_engine = tournament.Engine('random')
+        search_engine = tournament.Engine('search:depth=1')
+        result = tournament.play_game(random_engine, search_engine, 0)
+        self.assertEqual(
+            result, tournament.play_game(random_engine, search_engine, 0))
+        winner, plies = result
+        self.assertIsInstance(winner, Board.Player)
+        self.assertLessEqual(plies, 200)
+
+        self.assertEqual(
+            tournament.play_game(random_engine, random_engine, 0,
+                                 max_plies=3),
+            (Board.Player.none, 3))
+
+    def test_colours_alternate(self):
+        specs = ('random', 'random')
+        first = tournament._play_task((specs, 4, 7, 4, 20))
+        second = tournament._play_task((specs, 5, 7, 4, 20))
+        self.assertEqual((first.white, first.black), (0, 1))
+        self.assertEqual((second.white, second.black), (1, 0))
+        self.assertEqual(first.seed, second.seed)
+
+    def test_results_file(self):
+        results = [
+            tournament.GameResult(0, 3, 0, 1, Board.Player.white.value, 40),
+            tournament.GameResult(1, 3, 1, 0, Board.Player.none.value, 200),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results')
+            self.assertIsNone(tournament.read_engines(path))
+            self.assertEqual(tournament.read_results(path), [])
+            specs = ['random', 'search:depth=2']
+            with open(path, 'wb') as results_file:
+                tournament.write_header(results_file, specs)
+            self.assertEqual(tournament.read_engines(path), specs)
+            self.assertEqual(tournament.read_results(path), [])
+            for result in results:
+                with open(path, 'ab') as results_file:
+                    tournament.write_result(results_file, result)
+            self.assertEqual(tournament.read_results(path), results)
+
+            # A record cut short by an interrupted write is dropped
+            # before more records are appended.
+            with open(path, 'ab') as results_file:
+                results_file.write(b'\x01\x02\x03')
+            tournament.truncate_results(path)
+            with open(path, 'ab') as results_file:
+                tournament.write_result(results_file, results[0])
+            self.assertEqual(tournament.read_results(path),
+                             results + results[:1])
+
+        self.assertEqual(tournament.get_outcome(results[0]), 0)
+        self.assertEqual(tournament.get_outcome(results[1]), 1)
+        self.assertEqual(tournament.get_outcome(
+            results[1]._replace(winner=Board.Player.white.value)), 2)
+        self.assertEqual(tournament.get_scores(results), [1, 1, 0])
+
+    def test_statistics(self):
+        score, low, high = tournament.get_score_interval(60, 20, 20)
+        self.assertAlmostEqual(score, 0.7)
+        self.assertLess(low, score)
+        self.assertGreater(high, score)
+        self.assertAlmostEqual(score - low, high - score)
+
+        self.assertEqual(tournament.get_elo(0.5), 0)
+        self.assertAlmostEqual(tournament.get_elo(10 / 11), 400)
+        self.assertEqual(tournament.get_elo(1.0), math.inf)
+
+if __name__ == '__main__':
+    unittest.main(exit=False)
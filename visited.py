@@ -0,0 +1,158 @@
+import array
+
+from board import Board
+import ranking
+
+# Visited sets for 64-bit board keys. All of them support the add, in
+# and len operations of a Python set, which is the default backend:
+#
+#   set:    a Python set, about 100 bytes per key.
+#   hash:   an open-addressing table of the keys in an array of uint64,
+#           under 16 bytes per key at its lowest load.
+#   bitset: one bit per position, indexed by the dense rank within its
+#           position class and allocated in pages. Only works for keys
+#           that are board ids, and only pays off once the visited
+#           boards fill most of the pages they touch.
+
+backends = ('set', 'hash', 'bitset')
+
+
+def create(backend='set'):
+    if backend == 'set':
+        return set()
+    if backend == 'hash':
+        return HashTable()
+    if backend == 'bitset':
+        return RankBitset()
+    raise ValueError('unknown visited set backend %r' % backend)
+
+
+class HashTable:
+
+    # Linear probing over slots that hold the keys themselves, so there
+    # are no false positives. Zero marks an empty slot, so a zero key is
+    # kept in a flag of its own.
+
+    max_load = 0.7
+    _multiplier = 0x9e3779b97f4a7c15
+    _key_mask = (1 << 64) - 1
+
+    def __init__(self, capacity_bits=10):
+        self._slots = array.array('Q', bytes(8 << capacity_bits))
+        self._shift = 64 - capacity_bits
+        self._slot_mask = (1 << capacity_bits) - 1
+        self._count = 0
+        self._has_zero = False
+
+    def __len__(self):
+        return self._count + self._has_zero
+
+    def _find(self, key):
+        # Returns the slot that holds the key or the empty slot it goes in.
+        slots = self._slots
+        slot_mask = self._slot_mask
+        index = ((key * self._multiplier) & self._key_mask) >> self._shift
+        while True:
+            slot_key = slots[index]
+            if slot_key == key or not slot_key:
+                return index
+            index = (index + 1) & slot_mask
+
+    def __contains__(self, key):
+        if not key:
+            return self._has_zero
+        return self._slots[self._find(key)] == key
+
+    def add(self, key):
+        if not key:
+            self._has_zero = True
+            return
+
+        index = self._find(key)
+        if self._slots[index]:
+            return
+        self._slots[index] = key
+        self._count += 1
+        if self._count > self.max_load * len(self._slots):
+            self._grow()
+
+    def _grow(self):
+        old_slots = self._slots
+        capacity_bits = 65 - self._shift
+        self._slots = array.array('Q', bytes(8 << capacity_bits))
+        self._shift = 64 - capacity_bits
+        self._slot_mask = (1 << capacity_bits) - 1
+        for key in old_slots:
+            if key:
+                self._slots[self._find(key)] = key
+
+    def __iter__(self):
+        if self._has_zero:
+            yield 0
+        for key in self._slots:
+            if key:
+                yield key
+
+    def get_size(self):
+        # Bytes used by the slots.
+        return self._slots.itemsize * len(self._slots)
+
+
+class RankBitset:
+
+    # Keys are unique or universal board ids. The bits of a position
+    # class are split into pages that are allocated the first time a
+    # board in their range is added, so sparse classes stay small.
+
+    page_bits = 15
+
+    def __init__(self):
+        self._pages = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @classmethod
+    def _locate(cls, board_id):
+        white_mask = (board_id >> Board.num_points) & Board.full_mask
+        black_mask = board_id & Board.full_mask
+        class_key = (board_id >> (2 * Board.num_points),
+                     white_mask.bit_count(), black_mask.bit_count())
+        index = ranking.rank_masks(white_mask, black_mask)
+        page_mask = (1 << cls.page_bits) - 1
+        return (class_key, index >> cls.page_bits), index & page_mask
+
+    def __contains__(self, board_id):
+        page_key, index = self._locate(board_id)
+        page = self._pages.get(page_key)
+        return page is not None and bool(page[index >> 3] >> (index & 7) & 1)
+
+    def add(self, board_id):
+        page_key, index = self._locate(board_id)
+        page = self._pages.get(page_key)
+        if page is None:
+            page = bytearray(1 << (self.page_bits - 3))
+            self._pages[page_key] = page
+
+        bit = 1 << (index & 7)
+        if not page[index >> 3] & bit:
+            page[index >> 3] |= bit
+            self._count += 1
+
+    def __iter__(self):
+        for (class_key, page_index), page in self._pages.items():
+            meta, white_count, black_count = class_key
+            for byte_index, byte in enumerate(page):
+                while byte:
+                    low_bit = byte & -byte
+                    byte ^= low_bit
+                    index = (page_index << self.page_bits |
+                             byte_index << 3 | (low_bit.bit_length() - 1))
+                    white_mask, black_mask = ranking.unrank_masks(
+                        white_count, black_count, index)
+                    yield (meta << (2 * Board.num_points) |
+                           white_mask << Board.num_points | black_mask)
+
+    def get_size(self):
+        return len(self._pages) << (self.page_bits - 3)
@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from board import Board
+import visited
+
+class TestVisited(unittest.TestCase):
+    def get_board_ids(self, count):
+        # Movement phase boards from random games.
+        rng = random.Random(0)
+        board_ids = []
+        board = Board()
+        while len(board_ids) < count:
+            move_points = list(board.get_move_points())
+            if not move_points or \
+                    board.get_winner() is not Board.Player.none:
+                board = Board()
+                continue
+            board.apply_points(*rng.choice(move_points))
+            if not board.is_placing():
+                board_ids.append(board.get_universal_id())
+        return board_ids
+
+    def check_backend(self, backend, keys):
+        visited_set = visited.create(backend)
+        expected = set()
+        for key in keys:
+            self.assertEqual(key in visited_set, key in expected)
+            visited_set.add(key)
+            expected.add(key)
+            self.assertIn(key, visited_set)
+            self.assertEqual(len(visited_set), len(expected))
+        self.assertEqual(set(visited_set), expected)
+
+    def test_backends(self):
+        board_ids = self.get_board_ids(500)
+        for backend in visited.backends:
+            with self.subTest(backend=backend):
+                self.check_backend(backend, board_ids + board_ids[::7])
+
+    def test_hash_keys(self):
+        rng = random.Random(1)
+        keys = [rng.getrandbits(64) for _ in range(3000)] + [0, 0, 5]
+        self.check_backend('hash', keys)
+
+        table = visited.HashTable(capacity_bits=4)
+        for key in range(1, 1001):
+            table.add(key)
+        self.assertLessEqual(len(table), table.max_load * table.get_size() / 8)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            visited.create('bloom')
+
+if __name__ == '__main__':
+    unittest.main(exit=False)